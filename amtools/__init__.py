@@ -1,3 +1,3 @@
 
-from .line_reader import LineReader, ListReader, FileReader
+from .line_reader import LineReader, ListReader, StringReader, FileReader, MMapReader, StreamReader, PrefixReader
 
@@ -1,5 +1,6 @@
 import os
 
+from .fsutil import fsutil
 from .directory import Directory
 from .text_doc import TextDoc
 from .markdown_doc import MarkdownDoc
@@ -12,7 +13,7 @@ def create_document(path: str):
     if os.path.isdir(path):
         return Directory(path)
 
-    ext = os.path.splitext(path)[1]
+    ext = fsutil.split_ext(path)[1]
     if ext == '.txt':
         return TextDoc(path)
     if ext == ".md":
@@ -11,7 +11,7 @@ class File(PathObject):
         self.dir      = Directory(os.path.dirname(path))
 
         self.filename = os.path.basename(path)
-        self.ext      = os.path.splitext(self.filename)[1][1:]
+        self.ext      = fsutil.split_ext(self.filename)[1][1:]
 
         self.metadata = self.dir.metadata.copy()
 
@@ -2,6 +2,7 @@ import os
 import re
 
 from amtools import LineReader, FileReader, ListReader
+from amtools.line_reader import COMPRESSED_OPENERS
 
 class fsutil:
     """ Contains static methods for interacting with the file system """
@@ -9,10 +10,19 @@ class fsutil:
     @staticmethod
     def filename2title(filename: str) -> str:
         """ Takes the file name and makes it into a more readable title """
-        name = os.path.splitext(filename)[0]
+        name = fsutil.split_ext(filename)[0]
         words = re.split('[-_]', name)
         return ' '.join(word.capitalize() for word in words)
 
+    @staticmethod
+    def split_ext(filename: str) -> (str, str):
+        """ Splits the filename into (name, extension), looking past a compression
+                extension (e.g. notes.md.gz -> ('notes', '.md')) """
+        name, ext = os.path.splitext(filename)
+        if ext in COMPRESSED_OPENERS:
+            name, ext = os.path.splitext(name)
+        return name, ext
+
     @staticmethod
     def simplify_path(path: str) -> str:
         parts = path.split("/")
@@ -54,20 +64,21 @@ class fsutil:
         for f in os.listdir(dir_path):
             if f.startswith('.'):
                 continue
-            parts = os.path.splitext(f)
+            parts = fsutil.split_ext(f)
             if parts[1] in valid_extensions:
                 files[parts[0]] = os.path.join(dir_path, f)
         return files
 
     @staticmethod
-    def read_file_metadata(filename: str):
+    def read_file_metadata(filename: str, reader_type: type = FileReader):
         """ Reads the yaml metadata at the top of the given file
 
             filename: The file to read the metadata for
+            reader_type: The LineReader class used to read the file (FileReader or MMapReader)
             Returns a dictionary of metadata values, or None if the file does not exist
         """
         try:
-            line_reader = FileReader(filename)
+            line_reader = reader_type(filename)
             return fsutil.parse_metadata(line_reader)
         except UnicodeDecodeError:
             # Binary file type
@@ -1,21 +1,55 @@
 import os
+import sys
 
-from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import ElementIndex
+from amtools.markdown.parsers import MarkdownParser, default_parse_cache
 
 from .fsutil import fsutil
 from .text_doc import TextDoc
 
+# MarkdownDoc.parse_cache until the default cache is created
+DEFAULT_PARSE_CACHE = object()
+
 class MarkdownDoc(TextDoc):
     """ A wrapper to a markdown document on the filesystem """
 
+    # Shared ParseCache for parsed documents (set to None to disable caching),
+    #   the default one (see default_parse_cache) is created when the first document is parsed
+    parse_cache = DEFAULT_PARSE_CACHE
+
+    @staticmethod
+    def get_parse_cache():
+        if MarkdownDoc.parse_cache is DEFAULT_PARSE_CACHE:
+            try:
+                MarkdownDoc.parse_cache = default_parse_cache()
+            except OSError as e:
+                print(f"Parse cache disabled: {e}", file=sys.stderr)
+                MarkdownDoc.parse_cache = None
+        return MarkdownDoc.parse_cache
+
     def __init__(self, path: str):
         super().__init__(path)
         self.elements = None
+        self.outline = None
+        self.index = None
 
     def parse_elements(self) -> list:
         if self.elements is None:
-            self.elements = MarkdownParser.parse_file(self.path)
+            self.elements = MarkdownParser.parse_file(self.path, cache=MarkdownDoc.get_parse_cache())
         return self.elements
 
+    def get_index(self):
+        """ Returns an ElementIndex of the parsed elements, for looking them up by type """
+        if self.index is None:
+            self.index = ElementIndex(self.parse_elements())
+        return self.index
+
+    def get_outline(self) -> list:
+        """ Returns the document's top-level headings (OutlineHeadings), 
+                without parsing the whole document if it hasn't been already """
+        if self.outline is None:
+            self.outline = MarkdownParser.scan_outline_file(self.path)
+        return self.outline
+
     def __str__(self):
         return self.path + '\n' + '\n'.join(map(str, self.parse_elements()))
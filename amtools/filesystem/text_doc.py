@@ -1,5 +1,6 @@
 import os
 
+from amtools.line_reader import open_text_file
 from .fsutil import fsutil
 from .file import File
 
@@ -13,7 +14,7 @@ class TextDoc(File):
             self.metadata[k] = v
 
     def get_text(self, skip_metadata=False) -> str:
-        with open(self.path, 'r') as f:
+        with open_text_file(self.path) as f:
             text = f.read()
         if skip_metadata:
             return fsutil.remove_metadata(text)
@@ -1,10 +1,32 @@
 import abc
+import bz2
+import codecs
+import gzip
+import lzma
+import mmap
+import os
+import re
+
+COMPRESSED_OPENERS = { '.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open }
+
+def open_text_file(filename :str):
+    """ Opens the given file for reading text, transparently
+            decompressing .gz, .bz2 and .xz files as they are read """
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(filename)[1], open)
+    return opener(filename, 'rt', encoding='utf-8')
 
 class LineReader:
     """ LineReader: Abstract Interface for reading text line by line """
 
     def __init__(self):
         """ Note: Call super __init__ after the reader is set up """
+        self.line_number = 0 # index of the peeked line
+        self.peeked_line = self._next_line()
+
+    def _advance(self) -> None:
+        """ Moves the peeked line forward, counting the lines passed over """
+        if self.peeked_line is not None:
+            self.line_number += 1
         self.peeked_line = self._next_line()
 
     def at_end(self) -> bool:
@@ -19,7 +41,7 @@ class LineReader:
     def skip_line(self) -> None:
         """ Moves the reader forward one line """
         if self.peeked_line is not None:
-            self.peeked_line = self._next_line()
+            self._advance()
 
     def read_line(self, skip_empty=False) -> str:
         """ Returns the next line in the reader 
@@ -28,10 +50,10 @@ class LineReader:
 
         if skip_empty:
             while self.peeked_line is not None and self.peeked_line.strip() == "":
-                self.peeked_line = self._next_line()
+                self._advance()
         
         next_line = self.peeked_line
-        self.peeked_line = self._next_line()
+        self._advance()
         return next_line
     
     def read_line_if(self, test) -> str:
@@ -62,11 +84,11 @@ class LineReader:
             if any(self.peeked_line.startswith(p) for p in patterns):
                 break
             lines.append(self.peeked_line)
-            self.peeked_line = self._next_line()
+            self._advance()
 
         if include_end and self.peeked_line is not None:
             lines.append(self.peeked_line)
-            self.peeked_line = self._next_line()
+            self._advance()
 
         return lines
 
@@ -80,12 +102,14 @@ class LineReader:
 class ListReader(LineReader):
     """ ListReader: Implements the LineReader interface over a list of strings """
 
-    def __init__(self, lines: list):
-        """ lines: list of strings """
-        self.index = 0
+    def __init__(self, lines: list, start: int = 0):
+        """ lines: list of strings 
+            start: the index of the first line to read """
+        self.index = start
         self.lines = lines
         self.num_lines = len(lines)
         super().__init__()
+        self.line_number = start
 
     def _next_line(self) -> str:
         if self.index >= self.num_lines:
@@ -94,14 +118,83 @@ class ListReader(LineReader):
         return self.lines[self.index-1]
 
 
+class StringReader(LineReader):
+    """ StringReader: Implements the LineReader interface over a string 
+            Lines are sliced out of the string as they are read, 
+            giving the same lines as splitting the text on newlines """
+
+    def __init__(self, text: str):
+        """ text: the string to read """
+        self.text = text
+        self.position = 0
+        super().__init__()
+
+    def _next_line(self) -> str:
+        if self.position > len(self.text):
+            return None
+        end = self.text.find('\n', self.position)
+        if end < 0:
+            end = len(self.text)
+        start, self.position = self.position, end + 1
+        return self.text[start:end]
+
+
+class PrefixReader(LineReader):
+    """ PrefixReader: Implements the LineReader interface as a view of the block of lines 
+            at the front of another reader that start with a prefix (such as '> ' or an indent)
+            Lines come straight from the parent with the prefix removed, and the parent is only
+            advanced as lines are read, so the block is never copied or read past """
+
+    def __init__(self, parent: LineReader, prefix: re.Pattern, skip: re.Pattern = None):
+        """ parent: the reader to take lines from
+            prefix: lines are read until one doesn't match this pattern, 
+                the matched part is removed from each line 
+            skip: (optional) lines matching this pattern are passed over """
+        self.parent = parent
+        self.prefix = prefix
+        self.skip = skip
+        self.source_line = None
+        self.stripped_line = None
+        # No super().__init__, there is no peeked line to read ahead of time
+        self.line_number = 0
+
+    @property
+    def peeked_line(self) -> str:
+        """ The parent's next line without the prefix (or None at the end of the block) """
+        line = self.parent.peek()
+        while line is not None and self.skip is not None and self.skip.match(line):
+            self.parent.skip_line()
+            line = self.parent.peek()
+
+        if line is not self.source_line:
+            re_match = None if line is None else self.prefix.match(line)
+            self.source_line = line
+            self.stripped_line = None if re_match is None else line[re_match.end():]
+        return self.stripped_line
+
+    def _advance(self) -> None:
+        if self.peeked_line is not None:
+            self._pass_line()
+
+    def _pass_line(self) -> None:
+        """ Moves past the parent's next line, which has already been peeked, 
+                without peeking again at every level of a chain of PrefixReaders """
+        self.line_number += 1
+        if isinstance(self.parent, PrefixReader):
+            self.parent._pass_line()
+        else:
+            self.parent.skip_line()
+
+
 class FileReader(LineReader):
-    """ FileReader: Implements the Line Reader interface for a text file """
+    """ FileReader: Implements the Line Reader interface for a text file
+            (compressed .gz, .bz2 and .xz files are decompressed as they are read) """
 
     def __init__(self, filename :str):
         """ filename: the name of the file to open 
             Note: will throw FileNotFoundException """
         self.filename = filename
-        self.file = open(filename, 'r', encoding='utf-8')
+        self.file = open_text_file(filename)
         self.open_file = True
         super().__init__()
 
@@ -114,7 +207,8 @@ class FileReader(LineReader):
             self._close()
             return None
 
-        return next_line[:-1]
+        # The last line of the file may not end with a newline
+        return next_line[:-1] if next_line[-1] == '\n' else next_line
     
     def _close(self) -> None:
         """ Closes the file handle """
@@ -122,3 +216,140 @@ class FileReader(LineReader):
         self.open_file = False
         self.peeked_line = None
 
+
+class MMapReader(LineReader):
+    """ MMapReader: Implements the LineReader interface over a memory-mapped text file
+            The mapped buffer is split into lines a chunk at a time, so large files
+            are never copied into memory as a whole
+            (compressed files can't be mapped, use FileReader for them) """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, filename :str):
+        """ filename: the name of the file to map
+            Note: will throw FileNotFoundException, and ValueError for a compressed file """
+        if os.path.splitext(filename)[1] in COMPRESSED_OPENERS:
+            raise ValueError(f"MMapReader can't read the compressed file {filename}, use FileReader")
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.buffer = None
+        self.position = 0
+        self.length = 0 if self.buffer is None else len(self.buffer)
+        self.lines = []
+        self.index = 0
+        super().__init__()
+
+    def _next_line(self) -> str:
+        if self.index >= len(self.lines) and not self._scan_chunk():
+            return None
+        self.index += 1
+        return self.lines[self.index-1]
+
+    def _scan_chunk(self) -> bool:
+        """ Decodes the next chunk of whole lines from the buffer
+            Returns False if the end of the file was reached """
+        if self.position >= self.length:
+            self._close()
+            return False
+
+        # The chunk ends with a newline (or the end of the file), so a \r\n is never split between chunks
+        end = self.buffer.find(b'\n', min(self.position + self.CHUNK_SIZE, self.length) - 1)
+        if end < 0:
+            end = self.length - 1
+        chunk = str(self.buffer[self.position:end + 1], 'utf-8')
+        self.position = end + 1
+
+        # Match the universal newline handling of FileReader
+        if '\r' in chunk:
+            chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
+        if chunk.endswith('\n'):
+            chunk = chunk[:-1]
+        self.lines = chunk.split('\n')
+        self.index = 0
+        return True
+
+    def _close(self) -> None:
+        """ Unmaps the file buffer """
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        self.lines = []
+        self.index = 0
+
+
+class StreamReader(LineReader):
+    """ StreamReader: Implements the LineReader interface over a stream of text
+            The stream can be a text or binary file object (stdin, a pipe, etc),
+            or any iterable of str/bytes chunks (such as a generator).
+            Only one chunk of the stream is held in memory at a time """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream, encoding :str = 'utf-8'):
+        """ stream: the file object or iterable to read from
+            encoding: used to decode bytes chunks """
+        self.chunks = self._read_chunks(stream)
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.partial_line = [] # pieces of the line held back, joined once its end is read
+        self.held_cr = False
+        self.lines = []
+        self.index = 0
+        super().__init__()
+
+    def _read_chunks(self, stream):
+        """ Yields fixed-size chunks from a file object, or the items of an iterable """
+        if hasattr(stream, 'read'):
+            while chunk := stream.read(self.CHUNK_SIZE):
+                yield chunk
+        else:
+            yield from stream
+
+    def _next_line(self) -> str:
+        while self.index >= len(self.lines):
+            if self.chunks is None:
+                return None
+            self._split_chunk()
+        self.index += 1
+        return self.lines[self.index-1]
+
+    def _split_chunk(self) -> None:
+        """ Reads the next chunk from the stream and splits it into whole lines,
+            holding back any partial line at the end until the next chunk """
+        chunk = next(self.chunks, None)
+        final = chunk is None
+        if final:
+            # End of stream, flush whatever is left
+            text = self.decoder.decode(b'', final=True)
+            self.chunks = None
+        elif isinstance(chunk, (bytes, bytearray)):
+            text = self.decoder.decode(chunk)
+        else:
+            text = chunk
+
+        # Match the universal newline handling of FileReader,
+        #   a \r at the end of a chunk is held back in case the next chunk starts with \n
+        if self.held_cr:
+            text = '\r' + text
+        self.held_cr = not final and text.endswith('\r')
+        if self.held_cr:
+            text = text[:-1]
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+        lines = text.split('\n')
+        self.partial_line.append(lines[0])
+        if len(lines) > 1:
+            lines[0] = ''.join(self.partial_line)
+            self.partial_line = [ lines.pop() ]
+        else:
+            lines = []
+        if final:
+            rest = ''.join(self.partial_line)
+            if rest != '':
+                lines.append(rest)
+            self.partial_line = []
+        self.lines = lines
+        self.index = 0
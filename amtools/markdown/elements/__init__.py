@@ -1,6 +1,7 @@
 
 from .markdown_element import MarkdownElement, EmptyElement
 from .inline_text import LineBreak, RawText, InlineText, BoldItalicsText, BoldText, ItalicsText, CodeText, LatexMath, StrikethroughText, HighlightText, Tag
+from .lazy_inline import UnparsedText, LazyInline
 from .html_comment import HtmlComment
 from .hyperlink import Hyperlink
 from .horizontal_rule import HorizontalRule
@@ -13,3 +14,6 @@ from .list_block import ListType, ListItem, ListBlock
 from .task_list import TaskItemStatus, TaskItem, TaskList
 from .table import Table
 from .custom_blocks import make_custom_block, Card, LinkList
+from .walk import walk, ElementIndex
+from .serialization import dump_elements, load_elements
+from .content_hash import content_hash
@@ -5,6 +5,7 @@ from .inline_text import InlineText
 
 class BlockQuote(MarkdownElement):
     """ A quoted block of text """
+    __slots__ = ('elements',)
 
     def __init__(self, elements):
         self.elements = elements
@@ -31,6 +32,7 @@ callout_symbols = {
 
 class Callout(BlockQuote):
     """ A quoted block of text with a special heading type """
+    __slots__ = ('type', 'symbol', 'title')
 
     def __init__(self, callout_type: str, title: InlineText, elements):
         super().__init__(elements)
@@ -2,6 +2,7 @@ from .markdown_element import MarkdownElement
 
 class CodeBlock(MarkdownElement):
     """ A block of verbatim code text """
+    __slots__ = ('text', 'lang')
 
     def __init__(self, text: str, lang:str):
         self.text = text
@@ -0,0 +1,77 @@
+""" A stable hash of an element and everything in it, for caching what is made from it
+        (e.g. the rendered html, see renderers.RenderCache)
+
+    The element is written the same way as the binary element tree format (see serialization)
+        and that data is hashed, except that inline text that hasn't been parsed yet is written
+        as its raw text (so hashing doesn't parse it) and slots that are only worked out from
+        the others (Table column widths, parsed cells) are left out
+    Lists, quotes and other blocks holding blocks that are nested in the element are written
+        as their own hash, so with a memo each block is only written once however deep it is
+    The same element parsed and not yet parsed hash differently, which only costs a cache miss
+"""
+import hashlib
+
+from .serialization import TreeWriter, ELEMENT_CLASSES, CLASS_TAGS, CLASS_INFO, FIRST_CLASS_TAG, MISSING
+from .lazy_inline import UnparsedText
+from .blockquote import BlockQuote
+from .list_block import ListBlock
+from .task_list import TaskList
+from .custom_blocks import Card, LinkList
+
+# Not in the dump data, only used here
+UNPARSED = -8
+NESTED = -9
+
+# Hashed on their own when nested, everything else is written as part of the block it is in
+CONTAINER_TYPES = (ListBlock, TaskList, BlockQuote, Card, LinkList)
+CONTAINER_CLASSES = frozenset(cls for cls in ELEMENT_CLASSES if issubclass(cls, CONTAINER_TYPES))
+
+DERIVED_SLOTS = { 'parse_func', '_cells', '_rows', '_widths' }
+
+class ContentHasher(TreeWriter):
+    def __init__(self, memo: dict = None):
+        super().__init__()
+        self.memo = memo
+
+    def write(self, value) -> None:
+        value_type = type(value)
+        if value_type in CONTAINER_CLASSES:
+            self.ints.append(NESTED)
+            TreeWriter.write(self, content_hash(value, self.memo))
+        elif value_type is UnparsedText:
+            self.ints.append(UNPARSED)
+            TreeWriter.write(self, value.text)
+        else:
+            TreeWriter.write(self, value)
+
+    def write_element(self, element, cls: type) -> None:
+        tag = CLASS_TAGS[cls]
+        self.ints.append(tag)
+        for slot in CLASS_INFO[FIRST_CLASS_TAG - tag][1]:
+            if slot in DERIVED_SLOTS:
+                continue
+            try:
+                value = getattr(element, slot)
+            except AttributeError:
+                self.ints.append(MISSING)
+                continue
+            self.write(value)
+
+def content_hash(element, memo: dict = None) -> str:
+    """ Returns a hex digest of the element's type and contents (including its children)
+            which is the same in every run for an identical element
+        memo: (optional) keeps the hashes of the nested lists, quotes, ... by id, for hashing a tree and the
+            blocks in it without working out any of them twice (the tree must not change)
+        Raises TypeError for elements that aren't one of the element classes """
+    if memo is not None and id(element) in memo:
+        return memo[id(element)][1]
+    cls = type(element)
+    if cls not in CLASS_TAGS:
+        raise TypeError(f"Cannot hash {cls.__name__}, it is not an element class")
+    hasher = ContentHasher(memo)
+    hasher.write_element(element, cls)
+    digest = hashlib.blake2b(hasher.to_bytes(), digest_size=16).hexdigest()
+    if memo is not None:
+        # (the element is kept so its id isn't reused while the memo is)
+        memo[id(element)] = (element, digest)
+    return digest
@@ -11,7 +11,8 @@ def make_custom_block(block_type: str, elements, *args):
     return BlockQuote(elements)
 
 class Card(MarkdownElement):
-    
+    __slots__ = ('title', 'elements')
+
     def __init__(self, title, elements):
         self.title = title
         self.elements = elements
@@ -24,6 +25,7 @@ class Card(MarkdownElement):
 
 class LinkList(MarkdownElement):
     """ A list of navigation links """
+    __slots__ = ('elements',)
 
     def __init__(self, elements):
         self.elements = elements
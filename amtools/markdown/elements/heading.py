@@ -4,6 +4,7 @@ from .inline_text import InlineText
 
 class Heading(MarkdownElement):
     """ A heading in a markdown document """
+    __slots__ = ('weight', 'title', 'hid')
 
     def __init__(self, weight: str, title: InlineText, hid: str):
         self.weight = weight
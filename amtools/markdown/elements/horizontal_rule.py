@@ -2,6 +2,7 @@ from .markdown_element import MarkdownElement
 
 class HorizontalRule(MarkdownElement):
     """ Represents a horizontal line in the file (--- or ===) """
+    __slots__ = ()
 
     def __str__(self):
         return "-------------------------------------------------"
@@ -14,6 +14,8 @@ SPECIAL_ELEMENTS = {
 }
 
 class HtmlComment(MarkdownElement):
+    __slots__ = ('comment',)
+
     def __init__(self, comment_text: str):
         if comment_text.strip() in SPECIAL_ELEMENTS:
             self.comment = SPECIAL_ELEMENTS[comment_text.strip()]
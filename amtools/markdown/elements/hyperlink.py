@@ -2,6 +2,8 @@ from .markdown_element import MarkdownElement
 from .inline_text import InlineText
 
 class Hyperlink(MarkdownElement):
+    __slots__ = ('text', 'addr', 'title')
+
     def __init__(self, text: InlineText, addr :str = None, title: str = None):
         self.text = text
         self.addr = addr
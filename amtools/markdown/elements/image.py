@@ -5,6 +5,8 @@ import re
 re_ALL_DIGITS = re.compile("^\d+$")
 
 class Image(MarkdownElement):
+    __slots__ = ('alt_text', 'filename', 'title', 'width')
+
     def __init__(self, alt_text:str, filename:str, title: str):
         self.alt_text = alt_text
         self.filename = filename
@@ -25,6 +27,8 @@ class Image(MarkdownElement):
         return f'IMG[{self.filename}]'
 
 class LinkedImage(Image):
+    __slots__ = ('addr',)
+
     def __init__(self, alt_text:str, filename:str, title: str, addr: str):
         super().__init__(alt_text, filename, title)
         self.addr = addr
@@ -3,10 +3,14 @@ import re
 from .markdown_element import MarkdownElement
 
 class LineBreak:
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[BR]"
 
 class InlineText(MarkdownElement):
+    __slots__ = ('elements',)
+
     def __init__(self, *elements):
         self.elements = []
         for el in elements:
@@ -30,6 +34,8 @@ class InlineText(MarkdownElement):
         return "[T:" + " ".join(map(str, self.elements)) + "]"
 
 class RawText(MarkdownElement):
+    __slots__ = ('text',)
+
     def __init__(self, text: str):
         self.text = text
 
@@ -40,6 +46,8 @@ class RawText(MarkdownElement):
         return "\"" + self.text + "\""
 
 class Tag(InlineText):
+    __slots__ = ('title',)
+
     def __init__(self, title: str):
         self.title = title
 
@@ -50,22 +58,32 @@ class Tag(InlineText):
         return "[#" + self.title + "]"
 
 class BoldItalicsText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[B+I:" + " ".join(map(str, self.elements)) + "]"
 
 class BoldText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[B:" + " ".join(map(str, self.elements)) + "]"
 
 class ItalicsText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[I:" + " ".join(map(str, self.elements)) + "]"
 
 class CodeText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[C:" + " ".join(map(str, self.elements)) + "]"
 
 class LatexMath(InlineText):
+    __slots__ = ('rendered_image',)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.rendered_image = None
@@ -74,10 +92,14 @@ class LatexMath(InlineText):
         return f"${self.raw_text()}$"
 
 class StrikethroughText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[--" + " ".join(map(str, self.elements)) + "--]"
 
 class HighlightText(InlineText):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "[H:" + " ".join(map(str, self.elements)) + "]"
 
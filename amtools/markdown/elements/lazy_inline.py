@@ -0,0 +1,55 @@
+from typing import Callable
+
+from .inline_text import InlineText
+
+class UnparsedText:
+    """ Inline text that hasn't been parsed yet, with the function that will parse it
+            (see LazyInline, elements holding one are parsed when first used) """
+    __slots__ = ('text', 'parse_func')
+
+    def __init__(self, text: str, parse_func: Callable[[str], InlineText]):
+        self.text = text
+        self.parse_func = parse_func
+
+    def parse(self) -> InlineText:
+        return self.parse_func(self.text)
+
+    def __reduce__(self):
+        # Pickled (for the parse cache or a worker process) as the parsed text,
+        #   so the parser doesn't have to be pickled with it
+        return (identity, (self.parse(),))
+
+def identity(value):
+    return value
+
+_default_parse_func = None
+
+def default_parse_func() -> Callable[[str], InlineText]:
+    """ The parse_inline_text of a default MarkdownParser, for raw text loaded
+            without the parser that read it (e.g. the cells of an unpickled Table) """
+    global _default_parse_func
+    if _default_parse_func is None:
+        # Imported here, the parsers import the elements
+        from amtools.markdown.parsers.markdown_parser import MarkdownParser
+        _default_parse_func = MarkdownParser().parse_inline_text
+    return _default_parse_func
+
+class LazyInline:
+    """ An element attribute holding inline text that can be set to UnparsedText,
+            which is parsed the first time the attribute is read and then kept
+        The value is stored in the _name slot, which the element class must declare """
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if isinstance(value, UnparsedText):
+            value = value.parse()
+            setattr(obj, self.slot, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
@@ -3,12 +3,16 @@ from enum import Enum
 
 from .markdown_element import MarkdownElement
 from .inline_text import InlineText
+from .lazy_inline import LazyInline
 
 class ListType(Enum):
     ORDERED = 1
     UNORDERED = 2
 
 class ListItem(MarkdownElement):
+    __slots__ = ('list_type', '_text')
+    text = LazyInline()
+
     def __init__(self, list_type: ListType, text: InlineText):
         self.list_type = list_type
         self.text = text
@@ -22,6 +26,7 @@ class ListItem(MarkdownElement):
 
 class ListBlock(MarkdownElement):
     """ A list in the document (bulleted or numbered) """
+    __slots__ = ('list_type', 'elements')
 
     def __init__(self, list_type: ListType, elements: List[MarkdownElement]):
         self.list_type = list_type
@@ -1,5 +1,9 @@
 
 class MarkdownElement:
+    """ Base class of the parsed elements, each subclass lists its attributes in __slots__ 
+            (subclasses of subclasses only list the attributes they add) """
+    __slots__ = ()
+
     def children(self):
         return []
 
@@ -8,4 +12,4 @@ class MarkdownElement:
             yield child
 
 class EmptyElement(MarkdownElement):
-    pass
+    __slots__ = ()
@@ -1,14 +1,28 @@
 from .markdown_element import MarkdownElement
 from .inline_text import InlineText, LineBreak
+from .lazy_inline import LazyInline
 
 class Paragraph(MarkdownElement):
     """ An entire paragraph of text (all text is wrapped in paragraphs) """
 
+    __slots__ = ('lines', '_text_element')
+    text_element = LazyInline()
+
     def __init__(self, text: str):
-        self.text = ""
+        self.lines = [] # joined on demand, so long paragraphs aren't built by repeated concatenation
         self.add_text(text)
         self.text_element = None
 
+    @property
+    def text(self) -> str:
+        if len(self.lines) > 1:
+            self.lines = [ "\n".join(self.lines) ]
+        return self.lines[0] if self.lines else ""
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self.lines = [ text ]
+
     def children(self):
         return [ self.text_element ]
 
@@ -23,7 +37,7 @@ class Paragraph(MarkdownElement):
             new_text = new_text[:-4]
             newline = True
 
-        self.text += ("\n" if self.text else "") + new_text + ("\n<br>" if newline else "")
+        self.lines.append(new_text + ("\n<br>" if newline else ""))
 
     def __str__(self) -> str:
         return "P(\n  " + self.text_element.raw_text() + "\n)"
@@ -0,0 +1,221 @@
+""" A compact binary format for element trees (used by the parse cache and the parallel parser)
+
+    The tree is written as a flat array of ints and a table of the strings it uses:
+        a string is its index in the table (>= 0), anything else starts with a negative tag
+        an element is its class tag followed by the values of its slots, in __slots__ order
+        a list is LIST, its length, then its items
+    Elements are rebuilt without calling __init__, so they come back exactly as they were dumped
+"""
+import gc
+import sys
+import struct
+from array import array
+from typing import List
+
+from .markdown_element import MarkdownElement, EmptyElement
+from .inline_text import LineBreak, RawText, InlineText, BoldItalicsText, BoldText, ItalicsText, CodeText, LatexMath, StrikethroughText, HighlightText, Tag
+from .lazy_inline import UnparsedText
+from .html_comment import HtmlComment
+from .hyperlink import Hyperlink
+from .horizontal_rule import HorizontalRule
+from .heading import Heading
+from .image import Image, LinkedImage
+from .paragraph import Paragraph
+from .code_block import CodeBlock
+from .blockquote import BlockQuote, Callout
+from .list_block import ListType, ListItem, ListBlock
+from .task_list import TaskItemStatus, TaskItem, TaskList
+from .table import Table
+from .custom_blocks import Card, LinkList
+
+# Change when the classes below (or their slots) change, older data will not load
+FORMAT_VERSION = 2
+MAGIC = b"AMTE"
+HEADER = struct.Struct("<4sBIII") # magic, version, number of strings, text bytes, number of ints
+
+# Only add to the end of these lists (or bump FORMAT_VERSION)
+ELEMENT_CLASSES = [ EmptyElement, LineBreak, InlineText, RawText, Tag, BoldItalicsText, BoldText, ItalicsText,
+                    CodeText, LatexMath, StrikethroughText, HighlightText, HtmlComment, Hyperlink, HorizontalRule,
+                    Heading, Image, LinkedImage, Paragraph, CodeBlock, BlockQuote, Callout, ListItem, ListBlock,
+                    TaskItem, TaskList, Table, Card, LinkList ]
+ENUM_CLASSES = [ ListType, TaskItemStatus ]
+
+NONE, LIST, INT, FALSE, TRUE, ENUM, MISSING = -1, -2, -3, -4, -5, -6, -7
+FIRST_CLASS_TAG = -16 # element classes are FIRST_CLASS_TAG - index
+
+def class_slots(cls: type) -> List[str]:
+    """ All the slots of the class, base class slots first """
+    slots = []
+    for base in reversed(cls.__mro__):
+        for slot in base.__dict__.get('__slots__', ()):
+            if slot not in ('__dict__', '__weakref__'):
+                slots.append(slot)
+    return slots
+
+def has_getstate(cls: type) -> bool:
+    return any('__getstate__' in base.__dict__ for base in cls.__mro__ if base is not object)
+
+CLASS_TAGS = { cls: FIRST_CLASS_TAG - i for i, cls in enumerate(ELEMENT_CLASSES) }
+CLASS_INFO = [ (cls, class_slots(cls), has_getstate(cls)) for cls in ELEMENT_CLASSES ]
+ENUM_TAGS = { cls: i for i, cls in enumerate(ENUM_CLASSES) }
+
+class TreeWriter:
+    def __init__(self):
+        self.strings = { }
+        self.ints = [ ]
+
+    def write(self, value) -> None:
+        ints = self.ints
+        value_type = type(value)
+        if value_type is str:
+            index = self.strings.get(value)
+            if index is None:
+                index = self.strings[value] = len(self.strings)
+            ints.append(index)
+        elif value is None:
+            ints.append(NONE)
+        elif value_type is list or value_type is tuple:
+            ints.append(LIST)
+            ints.append(len(value))
+            for item in value:
+                self.write(item)
+        elif value_type in CLASS_TAGS:
+            self.write_element(value, value_type)
+        elif value_type is UnparsedText:
+            self.write(value.parse())
+        elif value_type is bool:
+            ints.append(TRUE if value else FALSE)
+        elif value_type is int:
+            ints.append(INT)
+            ints.append(value)
+        elif value_type in ENUM_TAGS:
+            ints.append(ENUM)
+            ints.append(ENUM_TAGS[value_type])
+            ints.append(value.value)
+        else:
+            raise TypeError(f"Cannot serialize {value_type.__name__} in an element tree")
+
+    def write_element(self, element, cls: type) -> None:
+        tag = CLASS_TAGS[cls]
+        self.ints.append(tag)
+        cls, slots, getstate = CLASS_INFO[FIRST_CLASS_TAG - tag]
+        if getstate:
+            # Custom state (Table leaves out its parse function and parsed cells,
+            #   __setstate__ makes them again when the tree is loaded)
+            state = element.__getstate__()[1]
+            for slot in slots:
+                self.write(state.get(slot, None))
+            return
+
+        for slot in slots:
+            try:
+                value = getattr(element, slot)
+            except AttributeError:
+                self.ints.append(MISSING)
+                continue
+            if type(value) is UnparsedText:
+                # Keep the parsed text (as a LazyInline attribute would)
+                value = value.parse()
+                setattr(element, slot, value)
+            self.write(value)
+
+    def to_bytes(self) -> bytes:
+        strings = list(self.strings)
+        lengths = array('I', map(len, strings))
+        text = "".join(strings).encode('utf-8')
+        ints = array('i', self.ints)
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+            ints.byteswap()
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, len(strings), len(text), len(ints))
+        return b"".join([ header, lengths.tobytes(), text, ints.tobytes() ])
+
+class TreeReader:
+    def __init__(self, data: bytes):
+        magic, version, num_strings, text_bytes, num_ints = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not an element tree in format version {FORMAT_VERSION}")
+
+        pos = HEADER.size
+        lengths = array('I')
+        lengths.frombytes(data[pos:pos + 4 * num_strings])
+        pos += 4 * num_strings
+        text = data[pos:pos + text_bytes].decode('utf-8')
+        pos += text_bytes
+        ints = array('i')
+        ints.frombytes(data[pos:pos + 4 * num_ints])
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+            ints.byteswap()
+
+        self.strings = []
+        start = 0
+        for length in lengths:
+            self.strings.append(text[start:start + length])
+            start += length
+        self.ints = iter(ints.tolist())
+
+    def read(self):
+        return self.read_value(next(self.ints))
+
+    def read_value(self, value):
+        """ Reads the rest of the value starting with the given int
+                (strings are handled inline by the callers, they are most of the values) """
+        if value >= 0:
+            return self.strings[value]
+        ints = self.ints
+        strings = self.strings
+        if value <= FIRST_CLASS_TAG:
+            cls, slots, getstate = CLASS_INFO[FIRST_CLASS_TAG - value]
+            element = cls.__new__(cls)
+            if getstate:
+                # Custom state (Table makes its parse function again)
+                state = { }
+                for slot in slots:
+                    value = next(ints)
+                    if value != MISSING:
+                        state[slot] = strings[value] if value >= 0 else self.read_value(value)
+                element.__setstate__((None, state))
+                return element
+            for slot in slots:
+                value = next(ints)
+                if value >= 0:
+                    setattr(element, slot, strings[value])
+                elif value != MISSING:
+                    setattr(element, slot, self.read_value(value))
+            return element
+        if value == LIST:
+            items = []
+            for _ in range(next(ints)):
+                value = next(ints)
+                items.append(strings[value] if value >= 0 else self.read_value(value))
+            return items
+        if value == NONE:
+            return None
+        if value == INT:
+            return next(ints)
+        if value == FALSE or value == TRUE:
+            return value == TRUE
+        if value == ENUM:
+            enum_class = ENUM_CLASSES[next(ints)]
+            return enum_class(next(ints))
+        raise ValueError(f"Bad tag {value} in element tree data")
+
+def dump_elements(elements: List[MarkdownElement]) -> bytes:
+    """ Serializes a list of elements (any inline text not parsed yet is parsed first) """
+    writer = TreeWriter()
+    writer.write(list(elements))
+    return writer.to_bytes()
+
+def load_elements(data: bytes) -> List[MarkdownElement]:
+    """ Rebuilds the list of elements from dump_elements data
+            (raises ValueError if the data is from a different format version) """
+    # The tree has no reference cycles, so the garbage collector is paused while
+    #   it is built instead of running over and over as the elements are allocated
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return TreeReader(data).read()
+    finally:
+        if gc_enabled:
+            gc.enable()
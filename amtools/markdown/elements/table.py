@@ -1,36 +1,93 @@
-from typing import List
+from typing import Callable, List
 
 from .markdown_element import MarkdownElement
 from .inline_text import InlineText
+from .lazy_inline import default_parse_func
 
 class Table(MarkdownElement):
-    def __init__(self, headings: List[InlineText]):
-        self.headings = headings
-        self.num_cols = len(self.headings)
-        self.rows = []
-        self.widths = [ self.calc_width(h.raw_text()) for h in self.headings ]
+    """ A table stored column by column, cells can be given as raw strings
+            which are parsed (with parse_func) the first time they are used
+        Column widths are measured from the raw cells when first needed,
+            so measuring them doesn't parse the cells """
+    __slots__ = ('num_cols', 'num_rows', 'columns', 'parse_func', '_cells', '_rows', '_widths')
+
+    def __init__(self, headings: List[InlineText], parse_func: Callable[[str], InlineText] = None):
+        """ headings: the heading cells (InlineText or raw strings)
+            parse_func: parses a raw cell string into InlineText (the parser's parse_inline_text) """
+        self.num_cols = len(headings)
+        self.num_rows = 0
+        self.columns = [ [ heading ] for heading in headings ]
+        self.parse_func = parse_func
+        self._cells = [ None ] * self.num_cols # the parsed cells of each column, once one is used
+        self._rows = None
+        self._widths = None
+
+    def cell(self, row: int, col: int) -> InlineText:
+        """ Returns the parsed cell (row 0 holds the headings) """
+        cells = self._cells[col]
+        if cells is None:
+            cells = self._cells[col] = [ None ] * (self.num_rows + 1)
+        value = cells[row]
+        if value is None:
+            value = self.columns[col][row]
+            if isinstance(value, str):
+                value = self.parse_func(value) if self.parse_func is not None else InlineText(value)
+            cells[row] = value
+        return value
+
+    @property
+    def headings(self) -> List[InlineText]:
+        return [ self.cell(0, col) for col in range(self.num_cols) ]
+
+    @property
+    def rows(self) -> List[List[InlineText]]:
+        if self._rows is None:
+            self._rows = [ [ self.cell(row, col) for col in range(self.num_cols) ] for row in range(1, self.num_rows + 1) ]
+        return self._rows
+
+    @property
+    def widths(self) -> List[int]:
+        if self._widths is None:
+            self._widths = [ max(map(self.cell_width, column)) for column in self.columns ]
+        return self._widths
+
+    def column_width(self, col: int) -> int:
+        return self.widths[col]
+
+    def cell_width(self, value) -> int:
+        return self.calc_width(value if isinstance(value, str) else value.raw_text())
 
     def calc_width(self, text):
         return 5 + max(len(s) for s in text.split("<br>"))
 
     def children(self):
-        children = list(self.headings)
-        for row in self.rows:
-            children += row
-        return children
+        return [ self.cell(row, col) for row in range(self.num_rows + 1) for col in range(self.num_cols) ]
 
     def add_row(self, row: List[InlineText]) -> None:
-        new_row = []
         for i in range(self.num_cols):
-            if i < len(row):
-                new_row.append(row[i])
-            else:
-                new_row.append(InlineText())
-            self.widths[i] = max(self.widths[i], self.calc_width(new_row[i].raw_text()))
-        self.rows.append(new_row)
+            self.columns[i].append(row[i] if i < len(row) else InlineText())
+            if self._cells[i] is not None:
+                self._cells[i].append(None)
+        self.num_rows += 1
+        self._rows = None
+        self._widths = None
+
+    def __getstate__(self):
+        # Only the raw cells, the parse function and parsed cells are made again after loading
+        state = { name: getattr(self, name) for name in Table.__slots__ }
+        state['parse_func'] = None
+        state['_cells'] = [ None ] * self.num_cols
+        state['_rows'] = None
+        state['_widths'] = None
+        return (None, state)
+
+    def __setstate__(self, state):
+        for name, value in state[1].items():
+            setattr(self, name, value)
+        self.parse_func = default_parse_func()
 
     def print_headings(self) -> str:
-        return "| " + " | ".join(self.headings[i].raw_text().center(w) for i, w in enumerate(self.widths)) + " |"
+        return "| " + " | ".join(self.cell(0, i).raw_text().center(w) for i, w in enumerate(self.widths)) + " |"
 
     def print_hline(self) -> str:
         return "+" + "+".join( "-"*(w+2) for w in self.widths) + "+"
@@ -48,4 +105,3 @@ class Table(MarkdownElement):
         lines.append(self.print_hline())
 
         return "\n".join(lines)
-
@@ -12,6 +12,8 @@ class TaskItemStatus(Enum):
 
 class TaskItem(MarkdownElement):
     """ A specific task item to complete """
+    __slots__ = ('text', 'status')
+
     def __init__(self, text: InlineText, status: TaskItemStatus):
         self.text = text
         self.status = status
@@ -32,6 +34,8 @@ class TaskItem(MarkdownElement):
 
 class TaskList(MarkdownElement):
     """ A list of tasks to complete """
+    __slots__ = ('items',)
+
     def __init__(self, items: List[TaskItem]):
         self.items = items
 
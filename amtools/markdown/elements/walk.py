@@ -0,0 +1,49 @@
+from typing import Dict, List
+
+from .markdown_element import MarkdownElement
+
+def walk(elements, types=None):
+    """ Yields every element in the given element(s) and their descendants, in document order
+            (each element before its children), using a stack instead of recursion
+        elements: an element or a list of elements
+        types: (optional) a type or tuple of types, only elements of these types are yielded """
+    if isinstance(elements, MarkdownElement):
+        elements = [ elements ]
+    stack = [ iter(elements) ]
+    while stack:
+        for element in stack[-1]:
+            if not isinstance(element, MarkdownElement):
+                continue
+            if types is None or isinstance(element, types):
+                yield element
+            children = element.children()
+            if children:
+                stack.append(iter(children))
+                break
+        else:
+            stack.pop()
+
+class ElementIndex:
+    """ The elements of a document grouped by their type, built with a single walk
+            so repeated lookups don't have to go over the whole tree again """
+
+    def __init__(self, elements):
+        self.by_type: Dict[type, List[MarkdownElement]] = { }
+        self.positions: Dict[int, int] = { } # id(element) -> index in walk order
+        for i, element in enumerate(walk(elements)):
+            self.by_type.setdefault(type(element), []).append(element)
+            self.positions[id(element)] = i
+
+    def get(self, types) -> List[MarkdownElement]:
+        """ Returns the elements of the given type(s) (including subclasses), in document order """
+        if not isinstance(types, tuple):
+            types = (types,)
+        groups = [ elems for cls, elems in self.by_type.items() if issubclass(cls, types) ]
+        if len(groups) == 1:
+            return list(groups[0])
+        return sorted((el for elems in groups for el in elems), key=lambda el: self.positions[id(el)])
+
+    def count(self, types) -> int:
+        if not isinstance(types, tuple):
+            types = (types,)
+        return sum(len(elems) for cls, elems in self.by_type.items() if issubclass(cls, types))
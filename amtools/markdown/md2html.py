@@ -14,12 +14,16 @@ def perror(text: str):
 
 def main():
     """ Converts one or more markdown files to html documents 
-        --all: converts all markdown files in current dir """
+        --all: converts all markdown files in current dir
+        --assets=DIR: writes the css theme to DIR once and links it, instead of inlining it in every document """
     print_theme = False
+    asset_dir = None
     files = []
     for arg in sys.argv[1:]:
         if arg == "--all":
             files.extend([ f for f in os.listdir() if f.endswith(".md") ])
+        elif arg.startswith("--assets="):
+            asset_dir = arg[len("--assets="):]
         else:
             files.append(arg)
 
@@ -43,19 +47,16 @@ def main():
         with open(ifile, 'r') as f:
             markdown = f.read()
         markdown = fsutil.remove_metadata(markdown)
-        make_html_doc_from_markdown(ofile, markdown, css_files)
+        make_html_doc_from_markdown(ofile, markdown, css_files, asset_dir)
 
-def make_html_doc_from_markdown(filename, markdown, css_files):
-    """ Renders the given markdown as an html document and saves it as the given file """
+def make_html_doc_from_markdown(filename, markdown, css_files, asset_dir=None):
+    """ Renders the given markdown as an html document and saves it as the given file
+            (the html is written to the file as it is rendered) """
     elements = MarkdownParser.parse_string(markdown)
     renderer = HtmlRenderer()
-    html = renderer.render_document(filename, elements, css_files=css_files)
-    save_html_document(filename, html)
-
-def save_html_document(filename:str, html:str):
-    """ Writes the given html to a file """
     with open(filename, 'w') as f:
-        f.write(html)
+        renderer.render_document_to(f, filename, elements, css_files=css_files, asset_dir=asset_dir,
+                                    document_dir=os.path.dirname(os.path.abspath(filename)))
 
 if __name__ == "__main__":
     main()
@@ -1,2 +1,5 @@
-
 from .markdown_parser import MarkdownParser
+from .parsed_document import ParsedDocument
+from .outline import OutlineHeading
+from .parse_cache import ParseCache, default_parse_cache
+from .parse_profiler import ParseProfiler
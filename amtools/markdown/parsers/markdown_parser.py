@@ -1,10 +1,19 @@
+import os
 import re
-from dataclasses import dataclass
+import string
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from typing import Callable, List
 
-from amtools import LineReader, FileReader, ListReader
+from amtools import LineReader, FileReader, ListReader, StringReader, StreamReader, PrefixReader
 from amtools.markdown.elements import *
 
+from .parsed_document import ParsedDocument
+from .parse_cache import ParseCache
+from .parse_profiler import ParseProfiler
+from .outline import OutlineHeading
+
 r_COMMENT       = re.compile(r"^//")
 r_EMPTY_LINE    = re.compile(r"^[ \t]*$")
 r_INDENTED      = re.compile(r"^(\t|    )")
@@ -22,7 +31,7 @@ r_TAG           = re.compile(r"^\#([-/\w]*[a-zA-Z][-/\w]*)\b")
 r_TAG2          = re.compile(r"\s\#([-/\w]*[a-zA-Z][-/\w]*)\b")
 r_LINK          = re.compile(r'\[([^][]*)\]\(([^)("\s]+)\s*("[^"]+")?\)')
 r_INTERNAL_LINK = re.compile(r'\[\[([^][]*)\]\]\(([^)("\s]+)\s*("[^"]+")?\)')
-r_ANGLE_LINK    = re.compile(r"<([^<>\s]+\.[^<>\s]+)>")
+r_ANGLE_LINK    = re.compile(r"<([^<>\s][^<>\s.]*\.[^<>\s]+)>")
 #r_INTERNAL_LINK = re.compile(r"\[\[([^][]*)\]\]")
 #r_INLINE_IMAGE  = re.compile(r"!\[([^][]*)\]\(([^)(]+)\)")
 #r_INLINE_IMAGE2 = re.compile(r"!\[\[([^][]*)\]\]")
@@ -43,7 +52,17 @@ r_NUMBERED_LIST = re.compile(r"^[0-9A-Z]{1,3}\. ")
 r_CODE_BLOCK    = re.compile(r"^```\w*\s*$")
 r_BLOCK_QUOTE   = re.compile(r"^> ")
 r_CALLOUT_BLOCK = re.compile(r"^> \[!([-\w]+)\]\s*(.*)$")
-r_CUSTOM_BLOCK  = re.compile(r"^> \[!!([-\w]+[^]]*)\]\s*$")
+r_CUSTOM_BLOCK  = re.compile(r"^> \[!!([-\w][^]]*)\]\s*$")
+
+# Possible first characters of lines matching the line/block patterns
+EMPTY_LINE_CHARS = [ "", " ", "\t" ]
+HRULE_CHARS      = "-=_*"
+BULLET_CHARS     = "-*+"
+NUMBERED_CHARS   = string.digits + string.ascii_uppercase
+
+# Blocks nested deeper than this (quotes, list items) are kept as plain text, 
+#   so a pathological file can't hit the recursion limit
+MAX_NESTING_DEPTH = 32
 
 TASK_STATUS_SYMBOLS = { 'x': TaskItemStatus.COMPLETE, 'X': TaskItemStatus.COMPLETE, 
                         '?': TaskItemStatus.UNKNOWN,  ' ': TaskItemStatus.INCOMPLETE }
@@ -54,6 +73,21 @@ def get_indent(s):
         c += 1
     return c
 
+def strip_indents(line: str, max_indents: int) -> (int, str):
+    """ Removes up to max_indents leading indents (a tab or 4 spaces each, like r_INDENTED)
+        Returns the number of indents removed and the rest of the line """
+    pos = 0
+    indents = 0
+    while indents < max_indents:
+        if line.startswith('\t', pos):
+            pos += 1
+        elif line.startswith('    ', pos):
+            pos += 4
+        else:
+            break
+        indents += 1
+    return indents, line[pos:]
+
 class ParsedArg:
     pass
 
@@ -64,11 +98,78 @@ class UnparsedArg:
 class BlockElementMatcher:
     pattern: re.Pattern
     parser: Callable[[re.Match, LineReader], MarkdownElement]
+    first_chars: str = None # None if the pattern can start with any character
 
 @dataclass 
 class LineElementMatcher:
     pattern: re.Pattern
     parser: Callable[[str], MarkdownElement]
+    first_chars: str = None # None if the pattern can start with any character
+
+def build_dispatch_table(matchers: list) -> dict:
+    """ Maps each first character of a line to the list of matchers that can match it 
+            (in their original order), the None entry holds the matchers for any other line
+        A line's matchers are table.get(line[:1], table[None]) """
+    keys = set()
+    for matcher in matchers:
+        if matcher.first_chars is not None:
+            keys.update(matcher.first_chars)
+
+    table = { None: [ m for m in matchers if m.first_chars is None ] }
+    for key in keys:
+        table[key] = [ m for m in matchers if m.first_chars is None or key in m.first_chars ]
+    return table
+
+def skip_front_matter(reader: LineReader) -> None:
+    """ Skips the yaml metadata block (between --- lines) if the reader starts with one """
+    if not reader.at_end() and reader.peek().strip() == '---':
+        reader.skip_line()
+        reader.read_lines_until('---')
+
+def is_safe_split(lines: List[str], i: int) -> bool:
+    """ Returns true if line i starts a new top-level block after a blank line, 
+            and cannot continue a list or task list from before the blank line
+        (the caller must check that the blank line is not inside a code block) """
+    return r_EMPTY_LINE.match(lines[i-1]) is not None \
+        and r_EMPTY_LINE.match(lines[i]) is None \
+        and r_INDENTED.match(lines[i]) is None \
+        and r_BULLETED_LIST.match(lines[i]) is None \
+        and r_NUMBERED_LIST.match(lines[i]) is None
+
+def split_markdown_lines(lines: List[str], chunk_size: int) -> List[List[str]]:
+    """ Splits the lines into chunks of at least chunk_size lines that can be parsed
+            independently, giving the same elements as parsing all the lines at once """
+    chunks = []
+    chunk_start = 0
+    i = 0
+    while i < len(lines):
+        if i - chunk_start >= max(chunk_size, 1) and is_safe_split(lines, i):
+            chunks.append(lines[chunk_start:i])
+            chunk_start = i
+        line = lines[i]
+        i += 1
+        if line.startswith('```') and r_CODE_BLOCK.match(line):
+            # Never split inside a code block
+            while i < len(lines) and not lines[i].startswith('```'):
+                i += 1
+            i += 1
+        elif line.startswith('|') and r_TABLE.match(line):
+            # Or a table, like parse_table the line after the header is skipped whatever it is
+            i += 1
+            while i < len(lines) and r_TABLE.match(lines[i]):
+                i += 1
+    chunks.append(lines[chunk_start:])
+    return chunks
+
+def parse_lines(lines: List[str]) -> List[MarkdownElement]:
+    """ Parses a list of markdown lines """
+    parser = MarkdownParser()
+    return parser.parse_markdown(ListReader(lines))
+
+def parse_lines_to_bytes(lines: List[str]) -> bytes:
+    """ Parses a list of markdown lines into dump_elements data 
+            (used by the parallel parser's worker processes, it is much faster to send back than a pickle) """
+    return dump_elements(parse_lines(lines))
 
 class TextElementMatcher:
     def __init__(self, pattern: re.Pattern, element: MarkdownElement, *args):
@@ -77,57 +178,118 @@ class TextElementMatcher:
         self.args = args
 
 
-def split_match(text: str, re_match: re.Match) -> (str, List[str], str):
-    s, e   = re_match.start(), re_match.end()
-    before = text[:s]
-    inner  = re_match.groups()
-    after  = text[e:]
-    return (before, inner, after)
-
 class MarkdownParser:
     @staticmethod
-    def parse_string(markdown: str) -> List[MarkdownElement]:
-        """ Parses the given markdown in the string and returns a list of elements """
-        reader = ListReader(markdown.split('\n'))
+    def parse_string(markdown: str, profiler: ParseProfiler = None) -> List[MarkdownElement]:
+        """ Parses the given markdown in the string and returns a list of elements 
+            profiler: (optional) records the time spent in each matcher and parse method """
+        reader = StringReader(markdown)
+        parser = MarkdownParser()
+        if profiler is not None:
+            parser.enable_profiling(profiler)
+        return parser.parse_markdown(reader)
+
+    @staticmethod
+    def parse_string_parallel(markdown: str, workers: int = None, chunk_size: int = 2000) -> List[MarkdownElement]:
+        """ Parses the given markdown in the string using a pool of worker processes
+                and returns a list of elements (the same as parse_string)
+            workers: number of processes (defaults to the number of cpus)
+            chunk_size: the minimum number of lines given to a worker at a time """
+        chunks = split_markdown_lines(markdown.split('\n'), chunk_size)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1 or len(chunks) == 1:
+            return [ elem for chunk in chunks for elem in parse_lines(chunk) ]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [ elem for data in pool.map(parse_lines_to_bytes, chunks) for elem in load_elements(data) ]
+
+    @staticmethod
+    def parse_incremental(markdown: str, previous: ParsedDocument = None) -> ParsedDocument:
+        """ Parses the given markdown string and returns a ParsedDocument
+            previous: the result of parsing an earlier version of the same text,
+                unchanged top-level elements are reused from it instead of being parsed again """
+        parser = MarkdownParser()
+        return parser.parse_document(markdown, previous)
+
+    @staticmethod
+    def parse_stream(stream) -> List[MarkdownElement]:
+        """ Parses markdown from a file object, pipe, or iterable of text chunks
+                (e.g. sys.stdin) and returns a list of elements """
+        reader = StreamReader(stream)
         parser = MarkdownParser()
         return parser.parse_markdown(reader)
 
     @staticmethod
-    def parse_file(filename: str) -> List[MarkdownElement]:
-        """ Parses the given markdown file and returns a list of elements """
+    def parse_file(filename: str, reader_type: type = FileReader, cache: ParseCache = None, 
+                   profiler: ParseProfiler = None) -> List[MarkdownElement]:
+        """ Parses the given markdown file and returns a list of elements
+            reader_type: the LineReader class used to read the file (FileReader or MMapReader)
+            cache: if given, the elements are loaded from/saved to this ParseCache 
+            profiler: (optional) records the time spent in each matcher and parse method """
         try:
+            if cache is not None:
+                key = ParseCache.file_key(filename)
+                elements = cache.load(key)
+                if elements is not None:
+                    return elements
+
             # Skip meta block at the top
-            reader = FileReader(filename)
-            if reader.peek().strip() == '---':
-                reader.skip_line()
-                reader.read_lines_until('---')
+            reader = reader_type(filename)
+            skip_front_matter(reader)
 
             parser = MarkdownParser()
-            return parser.parse_markdown(reader)
+            if profiler is not None:
+                parser.enable_profiling(profiler)
+            elements = parser.parse_markdown(reader)
+            if cache is not None:
+                cache.store(key, elements)
+            return elements
         except FileNotFoundError:
             return None
         
+    @staticmethod
+    def scan_outline_string(markdown: str) -> List[OutlineHeading]:
+        """ Returns the top-level headings in the given markdown without parsing the rest of it """
+        parser = MarkdownParser()
+        return parser.scan_outline(StringReader(markdown))
+
+    @staticmethod
+    def scan_outline_file(filename: str, reader_type: type = FileReader) -> List[OutlineHeading]:
+        """ Returns the top-level headings in the given markdown file without parsing the rest of it
+                (line numbers count from the top of the file, including the meta block) """
+        try:
+            reader = reader_type(filename)
+            skip_front_matter(reader)
+            parser = MarkdownParser()
+            return parser.scan_outline(reader)
+        except FileNotFoundError:
+            return None
+
     def __init__(self):
+        self.nesting = 0 # number of nested blocks (PrefixReaders) around the lines being parsed
+        self.profiler = None
+
         self.block_matchers = [ ]
-        self.block_matchers.append(BlockElementMatcher(r_CUSTOM_BLOCK, self.parse_custom_block))
-        self.block_matchers.append(BlockElementMatcher(r_CALLOUT_BLOCK, self.parse_callout_block))
-        self.block_matchers.append(BlockElementMatcher(r_CODE_BLOCK,    self.parse_code_block))
-        self.block_matchers.append(BlockElementMatcher(r_BLOCK_QUOTE,   self.parse_block_quote))
-        self.block_matchers.append(BlockElementMatcher(r_TASK_LIST,     self.parse_task_list))
-        self.block_matchers.append(BlockElementMatcher(r_BULLETED_LIST, self.parse_bulleted_list))
-        self.block_matchers.append(BlockElementMatcher(r_NUMBERED_LIST, self.parse_numbered_list))
-        self.block_matchers.append(BlockElementMatcher(r_TABLE,         self.parse_table))
+        self.block_matchers.append(BlockElementMatcher(r_CUSTOM_BLOCK, self.parse_custom_block,   ">"))
+        self.block_matchers.append(BlockElementMatcher(r_CALLOUT_BLOCK, self.parse_callout_block, ">"))
+        self.block_matchers.append(BlockElementMatcher(r_CODE_BLOCK,    self.parse_code_block,     "`"))
+        self.block_matchers.append(BlockElementMatcher(r_BLOCK_QUOTE,   self.parse_block_quote,    ">"))
+        self.block_matchers.append(BlockElementMatcher(r_TASK_LIST,     self.parse_task_list,      "-"))
+        self.block_matchers.append(BlockElementMatcher(r_BULLETED_LIST, self.parse_bulleted_list,  BULLET_CHARS))
+        self.block_matchers.append(BlockElementMatcher(r_NUMBERED_LIST, self.parse_numbered_list,  NUMBERED_CHARS))
+        self.block_matchers.append(BlockElementMatcher(r_TABLE,         self.parse_table,          "|"))
 
         self.line_matchers = [ ]
-        self.line_matchers.append(LineElementMatcher(r_EMPTY_LINE, self.skip_line))
-        self.line_matchers.append(LineElementMatcher(r_COMMENT, self.skip_line))
-        self.line_matchers.append(LineElementMatcher(r_HEADING, self.parse_heading))
-        self.line_matchers.append(LineElementMatcher(r_HRULE,   self.parse_hrule))
-        self.line_matchers.append(LineElementMatcher(r_LINKED_IMAGE, self.parse_linked_image))
-        self.line_matchers.append(LineElementMatcher(r_IMAGE,   self.parse_image))
-        self.line_matchers.append(LineElementMatcher(r_IMAGE2,  self.parse_image))
-        self.line_matchers.append(LineElementMatcher(r_IMAGE3,  self.parse_embedded_image))
-        self.line_matchers.append(LineElementMatcher(r_HTML_COMMENT, self.parse_html_comment))
+        self.line_matchers.append(LineElementMatcher(r_EMPTY_LINE, self.skip_line,        EMPTY_LINE_CHARS))
+        self.line_matchers.append(LineElementMatcher(r_COMMENT,    self.skip_line,        "/"))
+        self.line_matchers.append(LineElementMatcher(r_HEADING,    self.parse_heading,    "#"))
+        self.line_matchers.append(LineElementMatcher(r_HRULE,      self.parse_hrule,      HRULE_CHARS))
+        self.line_matchers.append(LineElementMatcher(r_LINKED_IMAGE, self.parse_linked_image, "["))
+        self.line_matchers.append(LineElementMatcher(r_IMAGE,      self.parse_image,      "!"))
+        self.line_matchers.append(LineElementMatcher(r_IMAGE2,     self.parse_image,      "!"))
+        self.line_matchers.append(LineElementMatcher(r_IMAGE3,     self.parse_embedded_image, "!"))
+        self.line_matchers.append(LineElementMatcher(r_HTML_COMMENT, self.parse_html_comment, "<"))
 
         self.text_matchers = [ ]
         #self.text_matchers.append(TextElementMatcher(r_INLINE_IMAGE, Image, UnparsedArg))
@@ -145,21 +307,148 @@ class MarkdownParser:
         self.text_matchers.append(TextElementMatcher(r_HIGHLIGHT, HighlightText, ParsedArg))
         #self.text_matchers.append(TextElementMatcher(r_CODE2, CodeText, UnparsedArg))
         self.text_matchers.append(TextElementMatcher(r_CODE, CodeText, UnparsedArg))
+        self.compile_text_matchers()
+        self.compile_dispatch_tables()
+
+    def enable_profiling(self, profiler: ParseProfiler = None) -> ParseProfiler:
+        """ Wraps the matchers and parse methods of this parser to record their attempts, 
+                hits and time in the profiler (a new one if not given), which is returned
+            The text matchers run as one combined text_pattern, so their attempts are 
+                the text_pattern searches, each text matcher only records its hits
+            Nothing is wrapped unless this is called, so normal parsing has no overhead """
+        if self.profiler is not None:
+            return self.profiler
+        self.profiler = profiler if profiler is not None else ParseProfiler()
+
+        # Wrap the bound parse methods (the static parse_* functions and generators are left alone)
+        for name, value in vars(MarkdownParser).items():
+            if name.startswith('parse_') and inspect.isfunction(value) and not inspect.isgeneratorfunction(value):
+                setattr(self, name, self.profiler.wrap_method(name, getattr(self, name)))
+
+        def wrap_matcher(kind: str, matcher):
+            return replace(matcher, pattern=self.profiler.wrap_pattern(f"{kind} {matcher.pattern.pattern}", matcher.pattern),
+                                    parser=self.profiler.wrap_method(matcher.parser.__name__, matcher.parser))
+        self.line_matchers = [ wrap_matcher("line", m) for m in self.line_matchers ]
+        self.block_matchers = [ wrap_matcher("block", m) for m in self.block_matchers ]
+        self.compile_dispatch_tables()
+
+        self.text_matchers = [ TextElementMatcher(m.pattern, self.profiler.wrap_method(f"text {m.pattern.pattern}", m.element), *m.args)
+                                    for m in self.text_matchers ]
+        self.compile_text_matchers()
+        self.text_pattern = self.profiler.wrap_pattern("text_pattern", self.text_pattern)
+        return self.profiler
+
+    def compile_dispatch_tables(self):
+        """ Builds the first character dispatch tables for the line and block matchers
+                (call again after changing line_matchers or block_matchers) """
+        self.line_dispatch = build_dispatch_table(self.line_matchers)
+        self.block_dispatch = build_dispatch_table(self.block_matchers)
+
+    def compile_text_matchers(self):
+        """ Combines the text_matchers into a single alternation pattern
+                (call again after changing text_matchers)
+            Alternatives are tried in order at each position, so the combined search
+            finds the earliest match, with ties going to the first matcher in the list """
+        alternatives = []
+        self.text_groups = { }
+        group = 1
+        for matcher in self.text_matchers:
+            alternatives.append("(" + matcher.pattern.pattern + ")")
+            self.text_groups[group] = matcher
+            group += matcher.pattern.groups + 1
+        self.text_pattern = re.compile("|".join(alternatives))
 
     def close_paragraph(self, paragraph, elements):
         if paragraph is not None:
             elements.append(paragraph)
-            paragraph.text_element = self.parse_inline_text(paragraph.text)
+            paragraph.text_element = UnparsedText(paragraph.text, self.parse_inline_text)
         return None
 
     def parse_markdown(self, line_reader: LineReader) -> List[MarkdownElement]:
         """ Parses all the lines in the given line_reader as markdown
             and returns a list of markdown Elements """
+        elements = []
+        for start_line, segment in self.parse_segments(line_reader):
+            elements.extend(segment)
+        return elements
+
+    def parse_nested(self, line_reader: LineReader, levels: int = 1) -> List[MarkdownElement]:
+        """ Parses the lines of a block nested levels deep inside the current one
+            Past MAX_NESTING_DEPTH the lines are kept as plain paragraphs instead """
+        if self.nesting + levels > MAX_NESTING_DEPTH:
+            return self.parse_plain_text(line_reader)
+
+        self.nesting += levels
+        try:
+            return self.parse_markdown(line_reader)
+        finally:
+            self.nesting -= levels
+
+    def parse_plain_text(self, line_reader: LineReader) -> List[MarkdownElement]:
+        """ Parses all the lines in the given line_reader as paragraphs of text, 
+                without looking for line or block elements """
+        elements = []
+        paragraph = None
+        while not line_reader.at_end():
+            line = line_reader.read_line()
+            if r_EMPTY_LINE.match(line):
+                paragraph = self.close_paragraph(paragraph, elements)
+            elif paragraph is None:
+                paragraph = Paragraph(line)
+            else:
+                paragraph.add_text(line)
+        self.close_paragraph(paragraph, elements)
+        return elements
+
+    def scan_outline(self, line_reader: LineReader) -> List[OutlineHeading]:
+        """ Returns the headings in the given line_reader, only looking at heading lines
+                and skipping over code blocks (so a # line inside one isn't taken as a heading)
+                and the line after a table header (which parse_table always skips)
+            Gives the same headings as the top-level Heading elements from parse_markdown, 
+                headings nested in block quotes or lists are not included """
+        headings = []
+        while not line_reader.at_end():
+            line = line_reader.peek()
+            if line.startswith('#'):
+                if (re_match := r_HEADING.match(line)) is not None:
+                    title = self.parse_inline_text(re_match.group(2))
+                    headings.append(OutlineHeading(len(re_match.group(1)), title, line_reader.line_number))
+            elif line.startswith('```') and r_CODE_BLOCK.match(line):
+                line_reader.skip_line()
+                line_reader.read_lines_until('```')
+                continue
+            elif line.startswith('|') and r_TABLE.match(line):
+                line_reader.skip_line()
+                line_reader.skip_line()
+                while not line_reader.at_end() and r_TABLE.match(line_reader.peek()):
+                    line_reader.skip_line()
+                continue
+            line_reader.skip_line()
+        return headings
+
+    def parse_iter(self, line_reader: LineReader):
+        """ Parses the lines in the given line_reader as markdown, yielding
+                each top-level element as soon as its block is closed
+            Use with a StreamReader to start working on a large document before it is fully read """
+        for start_line, segment in self.parse_segments(line_reader):
+            yield from segment
+
+    def parse_segments(self, line_reader: LineReader):
+        """ Parses all the lines in the given line_reader as markdown, 
+                yielding the elements in segments of (start_line, elements) 
+            A segment ends on a line where no paragraph is open, so the elements 
+                after it only depend on the lines from line_reader.line_number on """
 
         elements = []
+        start_line = line_reader.line_number
         current_paragraph = None
 
         while not line_reader.at_end():
+            if current_paragraph is None and len(elements) > 0:
+                yield (start_line, elements)
+                elements = []
+                start_line = line_reader.line_number
+
             # Peek at the next line in the file
             next_line = line_reader.peek()
 
@@ -184,7 +473,47 @@ class MarkdownParser:
             line_reader.skip_line()
 
         current_paragraph = self.close_paragraph(current_paragraph, elements)
-        return elements
+        if len(elements) > 0:
+            yield (start_line, elements)
+
+    def parse_document(self, markdown: str, previous: ParsedDocument = None) -> ParsedDocument:
+        """ Parses the given markdown into a ParsedDocument
+            previous: the ParsedDocument for an earlier version of the text, 
+                its segments are reused where the lines around them are unchanged, 
+                so only the edited part of the text is parsed again """
+        lines = markdown.split('\n')
+        old_lines, old_segments = ([], []) if previous is None else (previous.lines, previous.segments)
+        num_lines, num_old = len(lines), len(old_lines)
+
+        # Find the unchanged lines at the start and end of the text
+        limit = min(num_lines, num_old)
+        prefix = 0
+        while prefix < limit and lines[prefix] == old_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and lines[num_lines-1-suffix] == old_lines[num_old-1-suffix]:
+            suffix += 1
+
+        # Keep the segments that end (including the line that closed them) before the first change
+        k = 0
+        while k + 1 < len(old_segments) and old_segments[k+1][0] < prefix:
+            k += 1
+        segments = old_segments[:k]
+        resume = old_segments[k][0] if k < len(old_segments) else 0
+
+        # Parse from there until the parser lines up with an old segment in the unchanged suffix
+        shift = num_lines - num_old
+        old_starts = { start: i for i, (start, elems) in enumerate(old_segments) }
+        line_reader = ListReader(lines, resume)
+        for segment in self.parse_segments(line_reader):
+            segments.append(segment)
+            sync_line = line_reader.line_number
+            if sync_line >= num_lines - suffix and sync_line - shift in old_starts:
+                i = old_starts[sync_line - shift]
+                segments.extend((start + shift, elems) for start, elems in old_segments[i:])
+                break
+
+        return ParsedDocument(lines, segments)
 
     ################################################################
     # Line Elements - take up an entire line in the file
@@ -194,7 +523,11 @@ class MarkdownParser:
             If successful, consumes the line and returns the parsed element
             If no patterns match, returns None """
 
-        for matcher in self.line_matchers:
+        matchers = self.line_dispatch.get(line[:1])
+        if matchers is None:
+            matchers = self.line_dispatch[None]
+
+        for matcher in matchers:
             re_match = matcher.pattern.match(line)
             if re_match is not None:
                 return matcher.parser(line, re_match)
@@ -249,7 +582,11 @@ class MarkdownParser:
 
         next_line = line_reader.peek()
 
-        for matcher in self.block_matchers:
+        matchers = self.block_dispatch.get(next_line[:1])
+        if matchers is None:
+            matchers = self.block_dispatch[None]
+
+        for matcher in matchers:
             re_match = matcher.pattern.match(next_line)
             if re_match is not None:
                 return matcher.parser(re_match, line_reader)
@@ -265,11 +602,8 @@ class MarkdownParser:
 
     def parse_block_quote(self, re_match: re.Match, line_reader: LineReader) -> BlockQuote:
         """ Reads until the end of the block quote and returns a BlockQuote object """
-        lines = []
-        while not line_reader.at_end() and r_BLOCK_QUOTE.match(line_reader.peek()):
-            lines.append(line_reader.read_line()[2:])
-        block_reader = ListReader(lines)
-        block_elems = self.parse_markdown(block_reader)
+        block_reader = PrefixReader(line_reader, r_BLOCK_QUOTE)
+        block_elems = self.parse_nested(block_reader)
         return BlockQuote(block_elems)
 
     def parse_callout_block(self, re_match: re.Match, line_reader: LineReader) -> Callout:
@@ -324,46 +658,78 @@ class MarkdownParser:
 
     def parse_list_block(self, list_type: ListType, line_pattern: re.Pattern, 
                          line_reader: LineReader) -> ListBlock:
-        """ Reads until the end of the list block and return a ListBlock object """
-        elements = []
-        inner_lines = []
+        """ Reads until the end of the list block and return a ListBlock object 
+            Nested lists are built in one pass with a stack of the open lists (one per indent level), 
+                other indented content is parsed as an inner block of the innermost list """
+        stack = [ (list_type, line_pattern, []) ]
         while not line_reader.at_end():
             # Keep reading until we hit something that doesn't belong in the list
             next_line = line_reader.peek()
-            if line_pattern.match(next_line):
-                # Normal ListItem
-                if len(inner_lines) > 0:
-                    # If we are closing an inner block, parse and add it
-                    elements.extend(self.parse_markdown(ListReader(inner_lines)))
-                    inner_lines = []
-
-                item_text = re.sub(line_pattern, '', next_line)
-                item_text = self.parse_inline_text(item_text)
-                elements.append( ListItem(list_type, item_text) )
-
-            elif r_EMPTY_LINE.match(next_line):
+            if r_EMPTY_LINE.match(next_line):
                 # Ignore empty lines
-                pass
-
-            elif r_INDENTED.match(next_line):
-                # Read indented lines to parse later
-                next_line = re.sub(r_INDENTED, '', next_line)
-                inner_lines.append(next_line)
+                line_reader.skip_line()
+                continue
 
+            depth, text = strip_indents(next_line, len(stack))
+            if depth < len(stack):
+                self.close_nested_lists(stack, depth + 1)
+                if stack[depth][1].match(text):
+                    # ListItem in one of the open lists
+                    self.add_list_item(stack[depth], text)
+                    line_reader.skip_line()
+                    continue
+                if depth == 0:
+                    # If we hit a non-list line, exit
+                    break
+                # A different line at this depth ends the list there
+                self.close_nested_lists(stack, depth)
+
+            # The line is inside the innermost list
+            nested_list = None
+            if self.nesting + len(stack) < MAX_NESTING_DEPTH:
+                nested_list = self.match_nested_list(text)
+            if nested_list is not None:
+                stack.append( (*nested_list, []) )
+                self.add_list_item(stack[-1], text)
+                line_reader.skip_line()
             else:
-                # If we hit a non-empty line, exit
-                break
+                # Parse anything else (up to the next list item) as an inner block
+                inner_reader = line_reader
+                for _ in range(depth):
+                    inner_reader = PrefixReader(inner_reader, r_INDENTED, skip=r_EMPTY_LINE)
+                stack[-1][2].extend(self.parse_nested(inner_reader, depth))
+
+        self.close_nested_lists(stack, 1)
+        return ListBlock(list_type, stack[0][2])
+
+    def match_nested_list(self, text: str) -> (ListType, re.Pattern):
+        """ Returns the list type and item pattern if the text starts a 
+                bulleted or numbered list (task lists are left to parse_task_list) """
+        if r_TASK_LIST.match(text):
+            return None
+        if r_BULLETED_LIST.match(text):
+            return (ListType.UNORDERED, r_BULLETED_LIST)
+        if r_NUMBERED_LIST.match(text):
+            return (ListType.ORDERED, r_NUMBERED_LIST)
+        return None
 
-            line_reader.skip_line()
-        
-        if len(inner_lines) > 0:
-            elements.extend(self.parse_markdown(ListReader(inner_lines)))
-        return ListBlock(list_type, elements)
+    def add_list_item(self, open_list: tuple, text: str) -> None:
+        list_type, line_pattern, elements = open_list
+        item_text = re.sub(line_pattern, '', text)
+        item_text = UnparsedText(item_text, self.parse_inline_text)
+        elements.append( ListItem(list_type, item_text) )
+
+    def close_nested_lists(self, stack: list, depth: int) -> None:
+        """ Closes the open lists at the given depth and deeper, 
+                adding each one to the list that contains it """
+        while len(stack) > depth:
+            list_type, line_pattern, elements = stack.pop()
+            stack[-1][2].append(ListBlock(list_type, elements))
 
 
     def parse_table(self, re_match: re.Match, line_reader: LineReader) -> Table:
         headings = line_reader.read_line().split("|")[1:-1]
-        table = Table([self.parse_inline_text(heading.strip()) for heading in headings])
+        table = Table([ heading.strip() for heading in headings ], self.parse_inline_text)
 
         line_reader.skip_line()
 
@@ -372,7 +738,7 @@ class MarkdownParser:
             if not r_TABLE.match(next_line):
                 break
             cols = line_reader.read_line().split("|")[1:-1]
-            table.add_row([ self.parse_inline_text(col.strip()) for col in cols ])
+            table.add_row([ col.strip() for col in cols ])
 
         return table
 
@@ -382,44 +748,38 @@ class MarkdownParser:
     def parse_inline_text(self, text: str) -> InlineText:
         """ Will parse a blob of text with inline formatting elements, 
             such as bold, italics, inline code, links, etc """
-
-        matches = []
-        for matcher in self.text_matchers:
-            re_match = re.search(matcher.pattern, text)
-            if re_match is not None:
-                matches.append((re_match, matcher))
-
-        if len(matches) > 0:
-            matches.sort(key = lambda match: match[0].start())
-            first_match = matches[0]
-            return self.parse_matched_inline_text(text, first_match[0], first_match[1])
-
-        return RawText(text)
-
-    def collect_matched_args(self, inner_matches, arg_info): 
+        return self.parse_inline_range(text, 0, len(text))
+
+    def parse_inline_range(self, text: str, start: int, end: int) -> InlineText:
+        """ Parses the inline text in text[start:end], scanning left to right 
+                with the combined text_pattern and working on offsets instead of substrings 
+            Text before each match is parsed on its own, since a pattern ending in $ 
+                can match up against the start of the next match """
+        parts = []
+        pos = start
+        while (re_match := self.text_pattern.search(text, pos, end)) is not None:
+            matcher = self.text_groups[re_match.lastindex]
+            element_args = self.collect_matched_args(re_match, re_match.lastindex, matcher.args)
+            parts.append(self.parse_inline_range(text, pos, re_match.start()))
+            parts.append(matcher.element(*element_args))
+            pos = re_match.end()
+
+        if len(parts) == 0:
+            return RawText(text[start:end])
+        parts.append(RawText(text[pos:end]))
+        return InlineText(*parts)
+
+    def collect_matched_args(self, re_match: re.Match, group: int, arg_info): 
+        """ Collects the element arguments from the inner groups of the matcher 
+                whose outer group in the combined pattern is the given group """
         args = []
-        for i, mat in enumerate(inner_matches):
-            if i < len(arg_info):
-                if arg_info[i] is ParsedArg:
-                    args.append(self.parse_inline_text(mat))
-                else:
-                    args.append(mat)
-        while len(args) < len(arg_info):
-            args.append(None)
+        num_groups = self.text_groups[group].pattern.groups
+        for i in range(len(arg_info)):
+            g = group + 1 + i
+            if i >= num_groups or re_match.start(g) < 0:
+                args.append(None)
+            elif arg_info[i] is ParsedArg:
+                args.append(self.parse_inline_range(re_match.string, re_match.start(g), re_match.end(g)))
+            else:
+                args.append(re_match.group(g))
         return args
-
-    def parse_matched_inline_text(self, text: str, re_match: re.Match, matcher: TextElementMatcher) -> InlineText:
-        """ Given a regex match in a text string, splits into the three parts
-                (before, inner, after)
-            and parses each one before returning an InlineText containing all three """
-        before, inner_matches, after = split_match(text, re_match)
-        element_args = self.collect_matched_args(inner_matches, matcher.args)
-
-        return InlineText(
-            self.parse_inline_text(before), 
-            matcher.element(*element_args),
-            self.parse_inline_text(after) 
-        )
-
-
-
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+from amtools.markdown.elements import InlineText
+
+@dataclass
+class OutlineHeading:
+    """ A top-level heading found by MarkdownParser.scan_outline """
+    level: int
+    title: InlineText
+    line_number: int # index of the heading's line in the text/file (from 0)
+
+    def __str__(self) -> str:
+        return "#" * self.level + " " + self.title.raw_text()
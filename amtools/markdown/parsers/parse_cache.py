@@ -0,0 +1,124 @@
+import os
+import hashlib
+from typing import List
+
+from amtools.markdown.elements import MarkdownElement, dump_elements, load_elements
+
+# Bump when the parser's output changes, so old cache entries are not used
+PARSER_VERSION = "7"
+
+class ParseCache:
+    """ A content-addressed on-disk cache of parsed markdown files
+            Entries are keyed by a hash of the file contents and the parser version,
+            stored in the binary element tree format (see elements.serialization),
+            and the least recently used entries are removed once the cache gets too big
+        Errors reading or writing the cache directory are ignored (a failed load is a miss) """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        """ cache_dir: the directory to store entries in (created if needed)
+            max_bytes: the maximum total size of the cache entries """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def file_key(filename: str) -> str:
+        """ Returns the cache key for the file's current contents
+            Note: will throw FileNotFoundError """
+        digest = hashlib.sha256(PARSER_VERSION.encode())
+        with open(filename, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".cache")
+
+    def load(self, key: str) -> List[MarkdownElement]:
+        """ Returns the cached elements for the key, or None if not cached """
+        path = self.entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Mark the entry as recently used
+            os.utime(path)
+        except OSError:
+            return None
+
+        try:
+            return load_elements(data)
+        except Exception:
+            # Corrupt or incompatible entry, drop it
+            self.remove(path)
+            return None
+
+    def store(self, key: str, elements: List[MarkdownElement]) -> None:
+        """ Saves the elements in the cache under the key (nothing is saved if the directory can't be written) """
+        data = dump_elements(elements)
+        path = self.entry_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            total_bytes = self.get_total_bytes()
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            # Rewriting an entry replaces its old size
+            try:
+                total_bytes -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+
+            self.total_bytes = total_bytes + len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        except OSError:
+            self.remove(temp_path)
+            self.total_bytes = None
+
+    def get_total_bytes(self) -> int:
+        if self.total_bytes is None:
+            self.total_bytes = sum(size for path, mtime, size in self.list_entries())
+        return self.total_bytes
+
+    def list_entries(self) -> list:
+        """ Returns (path, mtime, size) for every entry in the cache """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".cache"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def evict(self) -> None:
+        """ Removes the least recently used entries until the cache is 
+                back under 3/4 of its maximum size """
+        entries = sorted(self.list_entries(), key=lambda entry: entry[1])
+        self.total_bytes = sum(size for path, mtime, size in entries)
+        for path, mtime, size in entries:
+            if self.total_bytes <= self.max_bytes * 3 // 4:
+                break
+            self.remove(path)
+            self.total_bytes -= size
+
+    def remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """ Removes every entry from the cache """
+        for path, mtime, size in self.list_entries():
+            self.remove(path)
+        self.total_bytes = 0
+
+def default_parse_cache() -> ParseCache:
+    """ Returns a ParseCache in the $AMTOOLS_PARSE_CACHE directory,
+            or None (caching disabled) if the variable is not set """
+    cache_dir = os.environ.get('AMTOOLS_PARSE_CACHE', '')
+    if cache_dir == '':
+        return None
+    return ParseCache(cache_dir)
@@ -0,0 +1,96 @@
+import json
+import time
+import functools
+from dataclasses import dataclass
+
+@dataclass
+class ProfileStats:
+    attempts: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+    active: bool = False # True while an outer call is being timed (so recursive calls aren't counted twice)
+
+class ProfiledPattern:
+    """ Wraps a compiled pattern, recording each match/search call
+            as an attempt and each returned match as a hit """
+
+    def __init__(self, stats: ProfileStats, pattern):
+        self.stats = stats
+        self.pattern = pattern
+
+    def match(self, *args):
+        start = time.perf_counter()
+        re_match = self.pattern.match(*args)
+        self.record(re_match, start)
+        return re_match
+
+    def search(self, *args):
+        start = time.perf_counter()
+        re_match = self.pattern.search(*args)
+        self.record(re_match, start)
+        return re_match
+
+    def record(self, re_match, start: float) -> None:
+        self.stats.seconds += time.perf_counter() - start
+        self.stats.attempts += 1
+        if re_match is not None:
+            self.stats.hits += 1
+
+    def __getattr__(self, name):
+        # Everything else (groups, flags, the pattern string) comes from the real pattern
+        return getattr(self.pattern, name)
+
+class ParseProfiler:
+    """ Collects the number of attempts, hits, and the cumulative time
+            for each matcher and parse method of a MarkdownParser
+        Use MarkdownParser.enable_profiling (or the profiler argument of parse_string/parse_file),
+            then read the results with report() or to_json() after parsing """
+
+    def __init__(self):
+        self.stats = { }
+
+    def get_stats(self, name: str) -> ProfileStats:
+        if name not in self.stats:
+            self.stats[name] = ProfileStats()
+        return self.stats[name]
+
+    def wrap_pattern(self, name: str, pattern) -> ProfiledPattern:
+        """ Returns the pattern wrapped to record its match/search calls under the given name """
+        return ProfiledPattern(self.get_stats(name), pattern)
+
+    def wrap_method(self, name: str, method):
+        """ Returns the method wrapped to record its calls under the given name
+            A call is an attempt and a hit if it returns something other than None,
+                the time of recursive calls is only counted in the outermost call """
+        stats = self.get_stats(name)
+
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            if stats.active:
+                result = method(*args, **kwargs)
+            else:
+                stats.active = True
+                start = time.perf_counter()
+                try:
+                    result = method(*args, **kwargs)
+                finally:
+                    stats.seconds += time.perf_counter() - start
+                    stats.active = False
+            stats.attempts += 1
+            if result is not None:
+                stats.hits += 1
+            return result
+        return profiled
+
+    def reset(self) -> None:
+        for stats in self.stats.values():
+            stats.attempts, stats.hits, stats.seconds = 0, 0, 0.0
+
+    def report(self) -> dict:
+        """ Returns { name: { attempts, hits, seconds } }, slowest first """
+        ordered = sorted(self.stats.items(), key=lambda item: item[1].seconds, reverse=True)
+        return { name: { 'attempts': stats.attempts, 'hits': stats.hits, 'seconds': stats.seconds }
+                    for name, stats in ordered }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.report(), indent=indent)
@@ -0,0 +1,25 @@
+from typing import List, Tuple
+
+from amtools.markdown.elements import MarkdownElement, ElementIndex
+
+class ParsedDocument:
+    """ A parsed markdown string that can be incrementally re-parsed after an edit
+            (see MarkdownParser.parse_incremental) """
+
+    def __init__(self, lines: List[str], segments: List[Tuple[int, List[MarkdownElement]]]):
+        """ lines: the lines of the markdown text
+            segments: the top-level elements grouped by the line their segment starts on """
+        self.lines = lines
+        self.segments = segments
+        self.elements = [ elem for start, elems in segments for elem in elems ]
+        self._index = None
+
+    @property
+    def index(self) -> ElementIndex:
+        """ The document's elements by type (built the first time it is used) """
+        if self._index is None:
+            self._index = ElementIndex(self.elements)
+        return self._index
+
+    def __str__(self) -> str:
+        return '\n'.join(map(str, self.elements))
@@ -3,3 +3,4 @@ from .renderer_factory import create_renderer
 from .html_renderer import HtmlRenderer
 from .menu_renderer import MenuRenderer
 from .pdf_renderer import PdfRenderer
+from .render_cache import RenderCache
@@ -0,0 +1,56 @@
+import os
+import hashlib
+from dataclasses import dataclass
+from typing import Dict
+
+@dataclass
+class CachedAsset:
+    mtime_ns: int
+    size: int
+    text: str
+    digest: str = None
+
+class AssetCache:
+    """ The css/js files used by the renderers, kept in memory after they are first read
+            A file is read again only when its modification time or size changes """
+
+    def __init__(self):
+        self.assets: Dict[str, CachedAsset] = { }
+
+    def get(self, filename: str) -> CachedAsset:
+        """ Note: will throw FileNotFoundError """
+        stat = os.stat(filename)
+        asset = self.assets.get(filename)
+        if asset is None or asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+            with open(filename, 'r') as f:
+                asset = CachedAsset(stat.st_mtime_ns, stat.st_size, f.read())
+            self.assets[filename] = asset
+        return asset
+
+    def read(self, filename: str) -> str:
+        """ Returns the contents of the file
+            Note: will throw FileNotFoundError """
+        return self.get(filename).text
+
+    def write_hashed(self, filename: str, asset_dir: str) -> str:
+        """ Copies the file to asset_dir, named by a hash of its contents (theme.<hash>.css),
+                unless it is already there, and returns the absolute path of the copy
+            Note: will throw FileNotFoundError """
+        asset = self.get(filename)
+        if asset.digest is None:
+            asset.digest = hashlib.sha256(asset.text.encode()).hexdigest()[:16]
+        name, ext = os.path.splitext(os.path.basename(filename))
+        path = os.path.abspath(os.path.join(asset_dir, f"{name}.{asset.digest}{ext}"))
+        if not os.path.exists(path):
+            os.makedirs(asset_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                f.write(asset.text)
+            os.replace(temp_path, path)
+        return path
+
+    def clear(self) -> None:
+        self.assets.clear()
+
+# Shared by all the renderers in the process
+default_asset_cache = AssetCache()
@@ -1,17 +1,63 @@
 import re 
 import os
+import sys
+import hashlib
+from types import FunctionType
+from contextlib import contextmanager
 
 from amtools.markdown.elements import *
+from amtools.markdown.parsers.parse_cache import PARSER_VERSION
 from .html_templates import HtmlTemplates
+from .type_dispatch import TypeDispatch
+from .render_cache import RenderCache
+from .asset_cache import default_asset_cache
 
 NL_PLACEHOLDER = '_#!_NL_!#_'
 
 DEFAULT_URL_MAPPER = lambda s: s
 
+# The elements enable_render_cache caches by default (the blocks that make up most of a document)
+CACHED_TYPES = (Paragraph, Table, CodeBlock, Heading, ListBlock, TaskList, BlockQuote)
+
+# The values a url mapper can close over and still get a key from function_key
+SIMPLE_TYPES = (str, int, float, bool, type(None))
+
+def is_simple_value(value) -> bool:
+    if type(value) is tuple:
+        return all(is_simple_value(v) for v in value)
+    return isinstance(value, SIMPLE_TYPES)
+
+def function_key(func) -> str:
+    """ The name and code of a url mapper and the values it closes over, which identify 
+            what it does well enough to key a cache saved between runs
+        Only plain functions closing over simple values (str, int, float, bool, None and 
+            tuples of them) get a key, a bound method, callable object or closure over 
+            anything else can map urls differently with the same name and code
+        Raises ValueError for those (pass url_mapper_key to enable_render_cache instead) """
+    if func is DEFAULT_URL_MAPPER:
+        return "default"
+    if not isinstance(func, FunctionType):
+        raise ValueError(f"Can't work out a cache key for url mapper {func!r}, pass url_mapper_key")
+    values = tuple(cell.cell_contents for cell in func.__closure__ or ()) + (func.__defaults__ or ())
+    if not is_simple_value(values):
+        raise ValueError(f"Can't work out a cache key for url mapper {func.__qualname__} "
+                         f"(it closes over values that aren't str/int/float/bool/None), pass url_mapper_key")
+    code = func.__code__
+    consts = tuple(c for c in code.co_consts if is_simple_value(c))
+    digest = hashlib.blake2b(code.co_code + repr((consts, code.co_names)).encode(), digest_size=8).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}#{digest}{values!r}"
+
 class HtmlRenderer:
-    def __init__(self, url_mapper = None):
+    def __init__(self, url_mapper = None, compact = False):
+        """ url_mapper: maps relative links/images to urls
+            compact: leaves the indentation of nested elements out of the html (faster for deeply nested documents) """
         self.url_mapper = DEFAULT_URL_MAPPER if url_mapper is None else url_mapper
-        self.renderers = { }
+        self.compact = compact
+        self.asset_cache = default_asset_cache
+        self.hash_memo = None # content hashes of the elements being rendered (see content_hashes)
+        # Block and inline elements are rendered by the function registered for their type,
+        #   or for their nearest base class (so subclasses can override the methods below)
+        self.renderers = TypeDispatch()
         self.renderers[HorizontalRule] = self.render_horizontal_rule
         self.renderers[Heading]        = self.render_heading
         self.renderers[Image]          = self.render_image
@@ -29,19 +75,98 @@ class HtmlRenderer:
         self.renderers[InlineText]     = self.render_text_element
         self.renderers[HtmlComment]    = self.render_html_comment
 
+        self.text_renderers = TypeDispatch()
+        self.text_renderers[RawText]           = self.render_raw_text
+        self.text_renderers[Tag]               = self.render_tag
+        self.text_renderers[Hyperlink]         = self.render_hyperlink
+        self.text_renderers[InlineText]        = self.render_inline_children
+        self.text_renderers[BoldItalicsText]   = self.render_bold_italics
+        self.text_renderers[BoldText]          = self.render_bold
+        self.text_renderers[ItalicsText]       = self.render_italics
+        self.text_renderers[CodeText]          = self.render_code_text
+        self.text_renderers[LatexMath]         = self.render_latex_math
+        self.text_renderers[StrikethroughText] = self.render_strikethrough
+        self.text_renderers[HighlightText]     = self.render_highlight
+
+    def enable_render_cache(self, cache: RenderCache, url_mapper_key: str = None, types: tuple = CACHED_TYPES) -> None:
+        """ Reuses the html in the cache for elements of the given types that have the same 
+                content hash and were rendered by the same renderer class and url mapper
+            url_mapper_key: identifies what the url mapper does, required unless it is the default
+                or a plain function closing over simple values (see function_key) """
+        config = self.render_config_key(url_mapper_key)
+        for cls in types:
+            render = self.renderers[cls]
+            if render is not None:
+                self.renderers[cls] = self.cached_render(render, cache, config)
+
+    def render_config_key(self, url_mapper_key: str = None) -> str:
+        cls = type(self)
+        if url_mapper_key is None:
+            url_mapper_key = function_key(self.url_mapper)
+        return f"{cls.__module__}.{cls.__qualname__}|{PARSER_VERSION}|{url_mapper_key}"
+
+    def cached_render(self, render, cache: RenderCache, config: str):
+        """ Wraps a render function to look up the html in the cache first """
+        def render_cached(elem) -> str:
+            try:
+                key = f"{config}|{HtmlTemplates.is_indented()}|{content_hash(elem, self.hash_memo)}"
+            except TypeError:
+                # Not one of the element classes, can't be hashed
+                return render(elem)
+            html = cache.get(key)
+            if html is None:
+                html = render(elem)
+                cache.put(key, html)
+            return html
+        return render_cached
+
+    @contextmanager
+    def content_hashes(self):
+        """ Keeps the content hashes the render cache works out inside the with block,
+                so the blocks nested in a cached element are hashed once, not once per level
+            The elements must not change inside the with block """
+        if self.hash_memo is not None:
+            yield
+            return
+        self.hash_memo = { }
+        try:
+            yield
+        finally:
+            self.hash_memo = None
+
     def render_markdown_elements(self, elements: list) -> str:
         """ Renders a list of markdown elements into a string of html """
-        body = '\n'.join(self.render_element(el) for el in elements)
+        with HtmlTemplates.indentation(not self.compact), self.content_hashes():
+            body = '\n'.join(self.render_element(el) for el in elements)
         html = body.replace(NL_PLACEHOLDER, '\n')
         return html
+
+    def render_to(self, stream, elements: list) -> None:
+        """ Renders a list of markdown elements as html, writing each top level element
+                to the stream (an open file, StringIO, ...) as soon as it is rendered
+            Writes the same html as render_markdown_elements returns, without holding all of it """
+        with HtmlTemplates.indentation(not self.compact), self.content_hashes():
+            self.write_elements(stream, elements)
+
+    def write_elements(self, stream, elements: list) -> None:
+        for i, el in enumerate(elements):
+            if i > 0:
+                stream.write('\n')
+            html = self.render_element(el)
+            if NL_PLACEHOLDER in html:
+                html = html.replace(NL_PLACEHOLDER, '\n')
+            stream.write(html)
     
     def render_element(self, elem) -> str:
         """ Renders a single markdown element as html and returns it """
-        if type(elem) in self.renderers:
-            return self.renderers[type(elem)](elem)
-        else:
-            print("HtmlRenderer.render_element: unknown element type " + str(type(elem)))
-            return str(elem)
+        if HtmlTemplates.is_indented() == self.compact:
+            with HtmlTemplates.indentation(not self.compact):
+                return self.render_element(elem)
+        render = self.renderers[type(elem)]
+        if render is not None:
+            return render(elem)
+        print("HtmlRenderer.render_element: unknown element type " + str(type(elem)))
+        return str(elem)
 
     def render_horizontal_rule(self, hr: HorizontalRule) -> str:
         return HtmlTemplates.hr()
@@ -73,7 +198,8 @@ class HtmlRenderer:
         return HtmlTemplates.task_list_item(item_text, li.symbol(), li.is_checked())
     
     def render_code_block(self, block: CodeBlock) -> str:
-        compacted_block = block.text.replace('\n', NL_PLACEHOLDER)
+        # Newlines are put back after rendering, so indenting the elements around it doesn't change the code
+        compacted_block = block.text.replace('\n', NL_PLACEHOLDER) if HtmlTemplates.is_indented() else block.text
         if block.lang != "":
             code_block = HtmlTemplates.code(compacted_block, cls=('language-' + block.lang))
         else:
@@ -104,8 +230,9 @@ class HtmlRenderer:
         return HtmlTemplates.unordered_list("\n".join(list_items), cls="link-list", style="--col_accent: var(--col_accent1)") 
 
     def render_table(self, table: Table) -> str:
-        headings = [ self.render_text_element(h) for h in table.headings ]
-        rows = [ [ self.render_text_element(c) for c in row ] for row in table.rows ]
+        cols = range(table.num_cols)
+        headings = [ self.render_text_element(table.cell(0, col)) for col in cols ]
+        rows = [ [ self.render_text_element(table.cell(row, col)) for col in cols ] for row in range(1, table.num_rows + 1) ]
         widths = [ "flex: " + str(w) + ";" for w in table.widths ]
         return HtmlTemplates.table(headings, rows, widths)
 
@@ -114,32 +241,44 @@ class HtmlRenderer:
         return HtmlTemplates.p(rendered_text)
 
     def render_text_element(self, text) -> str:
-        if isinstance(text, RawText):
-            return text.raw_text()
-        if isinstance(text, Tag):
-            return self.render_tag(text)
-        if isinstance(text, Hyperlink):
-            return self.render_hyperlink(text)
-        if isinstance(text, InlineText):
-            rendered_children = "".join(self.render_text_element(el) for el in text.elements)
-            if isinstance(text, BoldItalicsText):
-                return HtmlTemplates.bold(HtmlTemplates.italics(rendered_children))
-            if isinstance(text, BoldText):
-                return HtmlTemplates.bold(rendered_children)
-            if isinstance(text, ItalicsText):
-                return HtmlTemplates.italics(rendered_children)
-            if isinstance(text, CodeText):
-                return HtmlTemplates.code(rendered_children)
-            if isinstance(text, LatexMath):
-                return HtmlTemplates.latex(rendered_children)
-            if isinstance(text, StrikethroughText):
-                return HtmlTemplates.delete(rendered_children)
-            if isinstance(text, HighlightText):
-                return HtmlTemplates.mark(rendered_children)
-            return rendered_children
-
+        render = self.text_renderers[type(text)]
+        if render is not None:
+            return render(text)
         return str(text)
 
+    def render_raw_text(self, text: RawText) -> str:
+        return text.raw_text()
+
+    def render_inline_children(self, text: InlineText) -> str:
+        # Same as render_text_element on each child, without the extra call per child
+        text_renderers = self.text_renderers
+        rendered = []
+        for el in text.elements:
+            render = text_renderers[type(el)]
+            rendered.append(str(el) if render is None else render(el))
+        return "".join(rendered)
+
+    def render_bold_italics(self, text: BoldItalicsText) -> str:
+        return HtmlTemplates.bold(HtmlTemplates.italics(self.render_inline_children(text)))
+
+    def render_bold(self, text: BoldText) -> str:
+        return HtmlTemplates.bold(self.render_inline_children(text))
+
+    def render_italics(self, text: ItalicsText) -> str:
+        return HtmlTemplates.italics(self.render_inline_children(text))
+
+    def render_code_text(self, text: CodeText) -> str:
+        return HtmlTemplates.code(self.render_inline_children(text))
+
+    def render_latex_math(self, text: LatexMath) -> str:
+        return HtmlTemplates.latex(self.render_inline_children(text))
+
+    def render_strikethrough(self, text: StrikethroughText) -> str:
+        return HtmlTemplates.delete(self.render_inline_children(text))
+
+    def render_highlight(self, text: HighlightText) -> str:
+        return HtmlTemplates.mark(self.render_inline_children(text))
+
     def render_html_comment(self, comment: HtmlComment) -> str:
         return str(comment)
 
@@ -185,31 +324,66 @@ class HtmlRenderer:
 
         return HtmlTemplates.a(rendered_image, link_addr)
 
-    def render_document(self, title:str, elements:list, css_files:list=[], js_files:list=[]):
+    def render_document(self, title:str, elements:list, css_files:list=[], js_files:list=[], asset_dir:str=None, document_dir:str=None):
+        """ Renders the elements as an html document with the css/js files inlined,
+                or linked if asset_dir is given (see link_assets) """
         html = self.render_markdown_elements(elements)
+        if asset_dir is not None:
+            return self.render_linked_head(title, css_files, js_files, asset_dir, document_dir) + html + HtmlTemplates.document_inlined_tail()
         css = self.read_css_files(css_files)
         js = self.read_js_files(js_files)
         return HtmlTemplates.document_inlined(title, css, js, html)
 
+    def render_document_to(self, stream, title:str, elements:list, css_files:list=[], js_files:list=[], asset_dir:str=None, document_dir:str=None) -> None:
+        """ Writes the same html document as render_document to the stream, body element by element """
+        if asset_dir is not None:
+            stream.write(self.render_linked_head(title, css_files, js_files, asset_dir, document_dir))
+        else:
+            css = self.read_css_files(css_files)
+            js = self.read_js_files(js_files)
+            stream.write(HtmlTemplates.document_inlined_head(title, css, js))
+        self.render_to(stream, elements)
+        stream.write(HtmlTemplates.document_inlined_tail())
+
+    def render_linked_head(self, title:str, css_files:list, js_files:list, asset_dir:str, document_dir:str=None) -> str:
+        css_urls = self.link_assets(css_files, asset_dir, document_dir)
+        js_urls = self.link_assets(js_files, asset_dir, document_dir)
+        return HtmlTemplates.document_linked_head(title, css_urls, js_urls)
+
+    def link_assets(self, files:list, asset_dir:str, document_dir:str=None) -> list:
+        """ Copies the files to asset_dir, named by a hash of their contents so each version 
+                is only written once (and can be cached by browsers), and returns their urls
+            document_dir: the directory the document is saved in, the urls are then the paths
+                relative to it (otherwise the url_mapper maps the absolute paths of the copies) """
+        urls = []
+        for filename in files:
+            try:
+                path = self.asset_cache.write_hashed(filename, asset_dir)
+            except FileNotFoundError:
+                print(f"Asset File {filename} does not exist", file=sys.stderr)
+                continue
+            if document_dir is not None:
+                urls.append(os.path.relpath(path, document_dir).replace(os.sep, '/'))
+            else:
+                urls.append(self.url_mapper(path))
+        return urls
+
     def read_css_files(self, css_files):
         css = []
         for css_file in css_files:
-            if not os.path.exists(css_file):
+            try:
+                css.append(self.asset_cache.read(css_file))
+            except FileNotFoundError:
                 print(f"CSS File {css_file} does not exist", file=sys.stderr)
-                continue
-            with open(css_file, 'r') as f:
-                css.append(f.read())
         return "\n".join(css)
 
     def read_js_files(self, js_files):
         js = []
         for js_file in js_files:
-            if not os.path.exists(js_file):
+            try:
+                js.append(self.asset_cache.read(js_file))
+            except FileNotFoundError:
                 print(f"JavaScript File {js_file} does not exist", file=sys.stderr)
-                continue
-            with open(js_file, 'r') as f:
-                js.append(f.read())
         return "\n".join(js)
 
 
-
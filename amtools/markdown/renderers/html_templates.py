@@ -1,15 +1,40 @@
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Whether nested html is indented (see HtmlTemplates.indentation), per thread/async task
+INDENTED = ContextVar('indented', default=True)
+
 def indent(lines, n=1):
+    if not INDENTED.get():
+        return lines
     spaces = "  "*n
     return spaces + lines.replace("\n", "\n" + spaces)
 
 def info(**kwargs):
+    if not kwargs:
+        return ""
     if 'cls' in kwargs:
         kwargs['class'] = kwargs['cls']
         del kwargs['cls']
     return "".join(f" {k}=\"{v}\"" for k, v in kwargs.items())
 
 class HtmlTemplates:
+    @staticmethod
+    def is_indented() -> bool:
+        return INDENTED.get()
+
+    @staticmethod
+    @contextmanager
+    def indentation(indented: bool):
+        """ Sets whether the html rendered inside the with block (in this thread) is indented
+                Indenting re-copies the whole body of a nested element once for each level
+                it is nested in, without it rendering time only grows with the size of the html """
+        token = INDENTED.set(indented)
+        try:
+            yield
+        finally:
+            INDENTED.reset(token)
 
     @staticmethod
     def document(title, body, css_files=[], js_files=[]):
@@ -31,9 +56,33 @@ f"""<!DOCTYPE html>
 </body>
 </html>"""
 
+    @staticmethod
+    def document_linked_head(title, css_files=[], js_files=[]):
+        """ The start of a document like document_inlined (ended by document_inlined_tail),
+                with imports to the given css/js files instead of their contents """
+        styles = ''.join(f"    <link rel=\"stylesheet\" href=\"{ss}\">\n" for ss in css_files)
+        scripts = ''.join(f"    <script src=\"{js}\"></script>\n" for js in js_files)
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="X-UA-Compatible" content="IE=edge">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+{styles}{scripts}</head>
+<body>
+    <div class="content">
+"""
+
     @staticmethod
     def document_inlined(title, css, js, body_html):
         """ Renders the given html/css/js into a proper html document """
+        return HtmlTemplates.document_inlined_head(title, css, js) + body_html + HtmlTemplates.document_inlined_tail()
+
+    @staticmethod
+    def document_inlined_head(title, css, js):
+        """ The start of document_inlined, up to where the body html goes
+                (so the body can be written to a stream between the head and the tail) """
         return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -50,7 +99,12 @@ f"""<!DOCTYPE html>
 </head>
 <body>
     <div class="content">
-{body_html}
+"""
+
+    @staticmethod
+    def document_inlined_tail():
+        """ The end of document_inlined, after the body html """
+        return """
     </div>
 </body>
 </html>
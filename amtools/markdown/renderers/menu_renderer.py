@@ -6,16 +6,23 @@ from .html_renderer import HtmlRenderer
 from .html_templates import HtmlTemplates
 
 class MenuRenderer(HtmlRenderer):
-    def __init__(self, url_mapper = None):
-        super().__init__(url_mapper)
+    def __init__(self, url_mapper = None, compact = False):
+        super().__init__(url_mapper, compact)
 
     def unroll_nested_lists(self, list_block: ListBlock, depth:int=0):
+        """ Returns (item, depth) for each ListItem in the list and its nested lists, in order """
         list_items = []
-        for elem in list_block.elements:
-            if isinstance(elem, ListItem):
-                list_items.append( (elem, depth) )
-            elif isinstance(elem, ListBlock):
-                list_items.extend(self.unroll_nested_lists(elem, depth+1))
+        stack = [ (iter(list_block.elements), depth) ]
+        while stack:
+            elems, depth = stack[-1]
+            for elem in elems:
+                if isinstance(elem, ListItem):
+                    list_items.append( (elem, depth) )
+                elif isinstance(elem, ListBlock):
+                    stack.append( (iter(elem.elements), depth+1) )
+                    break
+            else:
+                stack.pop()
         return list_items
 
     def render_list_block(self, list_block: ListBlock):
@@ -48,14 +48,7 @@ def crop_image(file_name:str) -> str:
 
 
 def collect_latex_statements(elements: list):
-    latex_statements = []
-    for el in elements:
-        if el == elements:
-            continue
-        if isinstance(el, LatexMath):
-            latex_statements.append(el)
-        latex_statements.extend(collect_latex_statements(el))
-    return latex_statements
+    return list(walk(elements, LatexMath))
 
 def render_latex_statements(latex_statements: list):
     with NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
@@ -72,8 +65,8 @@ def render_latex_statements(latex_statements: list):
 
 
 class PdfRenderer(HtmlRenderer):
-    def __init__(self, url_mapper = None):
-        super().__init__(url_mapper)
+    def __init__(self, url_mapper = None, compact = False):
+        super().__init__(url_mapper, compact)
 
     def render_markdown_elements(self, elements: list) -> str:
         latex_statements = collect_latex_statements(elements)
@@ -81,9 +74,16 @@ class PdfRenderer(HtmlRenderer):
             render_latex_statements(latex_statements)
         return super().render_markdown_elements(elements)
 
+    def render_to(self, stream, elements: list) -> None:
+        latex_statements = collect_latex_statements(elements)
+        if len(latex_statements) > 0:
+            render_latex_statements(latex_statements)
+        super().render_to(stream, elements)
+
     def render_table(self, table: Table) -> str:
-        headings = [ self.render_text_element(h) for h in table.headings ]
-        rows = [ [ self.render_text_element(c) for c in row ] for row in table.rows ]
+        cols = range(table.num_cols)
+        headings = [ self.render_text_element(table.cell(0, col)) for col in cols ]
+        rows = [ [ self.render_text_element(table.cell(row, col)) for col in cols ] for row in range(1, table.num_rows + 1) ]
         wid_total = sum(table.widths)
         widths = [ "width: " + str((w*100)//wid_total) + "%;" for w in table.widths ]
         return HtmlTemplates.table(headings, rows, widths)
@@ -94,11 +94,6 @@ class PdfRenderer(HtmlRenderer):
             return HtmlTemplates.a(link_text, link.addr)
         return link_text
 
-    def render_text_element(self, text) -> str:
-        if isinstance(text, LatexMath):
-            return self.render_latex_math(text)
-        return super().render_text_element(text)
-
     def render_latex_math(self, text: LatexMath) -> str:
         if text.rendered_image == None:
             return HtmlTemplates.code(str(text))
@@ -0,0 +1,63 @@
+import os
+import json
+from collections import OrderedDict
+
+# Bump when the html the renderers make changes, so old saved entries are not used
+RENDER_CACHE_VERSION = "3"
+
+class RenderCache:
+    """ An LRU cache of rendered html fragments (see HtmlRenderer.enable_render_cache)
+            keyed by the content hash of an element and the configuration of the renderer
+        Can be saved to a file and loaded again in the next run, so elements that haven't
+            changed since the last build are not rendered again """
+
+    def __init__(self, max_entries: int = 100000, filename: str = None):
+        """ max_entries: the number of fragments kept, the least recently used are dropped first
+            filename: (optional) the file to load the cache from (if it exists) and save it to """
+        self.max_entries = max_entries
+        self.filename = filename
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+
+    def get(self, key: str) -> str:
+        """ Returns the cached html for the key, or None if not cached """
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def load(self, filename: str = None) -> None:
+        """ Adds the entries saved in the file (ignored if it is from a different version or unreadable) """
+        filename = self.filename if filename is None else filename
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != RENDER_CACHE_VERSION:
+            return
+        for key, html in data['entries']:
+            self.put(key, html)
+
+    def save(self, filename: str = None) -> None:
+        """ Writes the entries (least recently used first) to the file """
+        filename = self.filename if filename is None else filename
+        temp_path = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({ 'version': RENDER_CACHE_VERSION, 'entries': list(self.entries.items()) }, f)
+        os.replace(temp_path, filename)
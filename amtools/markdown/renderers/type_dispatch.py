@@ -0,0 +1,25 @@
+from typing import Callable, Dict
+
+class TypeDispatch(dict):
+    """ Maps element types to the functions that render them, dispatch[type(elem)](elem)
+        A type without its own function uses the one of its nearest base class (in MRO order),
+            which is looked up the first time the type is rendered and then cached in the dict
+        Types with no function at all map to None """
+
+    def __init__(self):
+        super().__init__()
+        self.handlers: Dict[type, Callable] = { }
+
+    def __setitem__(self, cls: type, handler: Callable) -> None:
+        """ Registers the function for the type (and its subclasses without their own) """
+        self.handlers[cls] = handler
+        self.clear()
+
+    def __missing__(self, cls: type) -> Callable:
+        handler = None
+        for base in cls.__mro__:
+            if base in self.handlers:
+                handler = self.handlers[base]
+                break
+        dict.__setitem__(self, cls, handler)
+        return handler
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer
+from benchmarks import CorpusGenerator
+
+CSS_FILES = [ os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "pdf-theme.css") ]
+NUM_DOCS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+DOC_KB = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+def build(out_dir: str, documents: list, asset_dir: str = None, reread: bool = False) -> (float, int):
+    """ Renders every document to a file in out_dir, returns the time and the total size of the output """
+    renderer = HtmlRenderer()
+    start = time.perf_counter()
+    for i, elements in enumerate(documents):
+        if reread:
+            # Read the css from disk for every document, as without the asset cache
+            renderer.asset_cache.clear()
+        with open(os.path.join(out_dir, f"doc{i}.html"), 'w') as f:
+            renderer.render_document_to(f, f"doc{i}", elements, css_files=CSS_FILES, asset_dir=asset_dir, document_dir=out_dir)
+    elapsed = time.perf_counter() - start
+
+    total = 0
+    for root, dirs, files in os.walk(out_dir):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return elapsed, total
+
+documents = [ MarkdownParser.parse_string(CorpusGenerator(seed).document(DOC_KB * 1024)) for seed in range(NUM_DOCS) ]
+HtmlRenderer().render_markdown_elements([ el for elements in documents for el in elements ]) # parses all the inline text first
+
+print(f"{NUM_DOCS} documents of {DOC_KB} KB, css {sum(os.path.getsize(f) for f in CSS_FILES) / 1024:.1f} KB")
+for name, asset_dir, reread in [ ("inlined, read each time", None, True), ("inlined, asset cache", None, False),
+                                 ("linked", "assets", False) ]:
+    times = []
+    for _ in range(3):
+        with TemporaryDirectory() as out_dir:
+            elapsed, total = build(out_dir, documents, asset_dir and os.path.join(out_dir, asset_dir), reread)
+        times.append(elapsed)
+    elapsed = min(times)
+    print(f"  {name:<24} {elapsed:.3f}s  {total / 1024 / 1024:8.2f} MB")
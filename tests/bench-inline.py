@@ -0,0 +1,39 @@
+import sys
+import time
+import random
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer
+
+SIZES = [ 1000, 10000, 100000 ]
+if len(sys.argv) > 1:
+    SIZES = [ int(arg) for arg in sys.argv[1:] ]
+
+WORDS = [ "the", "binary", "search", "tree", "node", "insert", "remove", "value" ]
+FORMATS = [ "**{}**", "_{}_", "`{}`", "~~{}~~", "=={}==", "***{}***", "$x_{}$", "[{}](https://www.google.com)" ]
+
+def make_paragraph(size: int, rand: random.Random) -> str:
+    """ Builds a paragraph of about size characters with dense inline formatting """
+    words = []
+    length = 0
+    while length < size:
+        word = rand.choice(WORDS)
+        if rand.random() < 0.3:
+            word = rand.choice(FORMATS).format(word)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+parser = MarkdownParser()
+renderer = HtmlRenderer()
+rand = random.Random(0)
+for size in SIZES:
+    text = make_paragraph(size, rand)
+    start = time.perf_counter()
+    inline_text = parser.parse_inline_text(text)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    renderer.render_text_element(inline_text)
+    render_elapsed = time.perf_counter() - start
+    print(f"{size:>8} chars  parse {elapsed:.4f}s  {elapsed * 1e6 / size:.3f} us/char"
+          f"  render {render_elapsed:.4f}s  {render_elapsed * 1e6 / size:.3f} us/char")
@@ -0,0 +1,28 @@
+import sys
+import time
+
+from amtools.markdown.parsers import MarkdownParser
+
+# Usage: python bench-lists.py [depth] [width]
+depth = 6
+width = 6
+if len(sys.argv) > 2:
+    depth, width = int(sys.argv[1]), int(sys.argv[2])
+
+def make_outline(depth: int, width: int, level: int = 0) -> list:
+    """ Builds an outline with width items at each level, nested depth levels deep """
+    lines = []
+    for i in range(width):
+        marker = "-" if level % 2 == 0 else f"{i+1}."
+        lines.append("\t" * level + f"{marker} Item {i} at level {level}")
+        if level + 1 < depth:
+            lines.extend(make_outline(depth, width, level + 1))
+    return lines
+
+for d in range(2, depth + 1):
+    lines = make_outline(d, width)
+    markdown = "\n".join(lines)
+    start = time.perf_counter()
+    MarkdownParser.parse_string(markdown)
+    elapsed = time.perf_counter() - start
+    print(f"depth {d} x width {width}: {len(lines):>7} lines  {elapsed:.3f}s  {elapsed * 1e6 / len(lines):.1f} us/line")
@@ -0,0 +1,35 @@
+import sys
+import tracemalloc
+from collections import Counter
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import MarkdownElement
+from benchmarks import CorpusGenerator
+
+SIZES_KB = [ 100, 1000 ]
+if len(sys.argv) > 1:
+    SIZES_KB = [ int(arg) for arg in sys.argv[1:] ]
+
+def count_elements(elements) -> Counter:
+    """ Counts the elements in the tree by type (reading every child, so all inline text gets parsed) """
+    counts = Counter()
+    stack = list(elements)
+    while stack:
+        element = stack.pop()
+        counts[type(element).__name__] += 1
+        if isinstance(element, MarkdownElement):
+            stack.extend(element.children())
+    return counts
+
+for size in SIZES_KB:
+    markdown = CorpusGenerator(0).document(size * 1024)
+
+    tracemalloc.start()
+    elements = MarkdownParser.parse_string(markdown)
+    counts = count_elements(elements)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_elements = sum(counts.values())
+    print(f"{size:>6} KB  {num_elements:>8} elements  {current / num_elements:.1f} bytes/element  "
+          f"tree {current / 1024 / 1024:.2f} MB  peak {peak / 1024 / 1024:.2f} MB")
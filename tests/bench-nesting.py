@@ -0,0 +1,44 @@
+import sys
+import time
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer
+
+DEPTH = 10
+REPEAT = [ 100, 1000 ]
+if len(sys.argv) > 1:
+    REPEAT = [ int(arg) for arg in sys.argv[1:] ]
+
+def nested_list(depth: int) -> str:
+    lines = []
+    for d in range(depth):
+        for i in range(3):
+            lines.append("    " * d + f"- item {i} at level {d} with **bold** and `code`")
+    return "\n".join(lines)
+
+def nested_callouts(depth: int) -> str:
+    lines = []
+    for d in range(depth):
+        prefix = "> " * d
+        lines.append(prefix + f"> [!note] Level {d}")
+        lines.append(prefix + f"> A paragraph at level {d} with _italics_")
+        lines.append(prefix + ">")
+    return "\n".join(lines)
+
+def time_func(func) -> (float, str):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+for name, make in [ ("lists", nested_list), ("callouts", nested_callouts) ]:
+    for repeat in REPEAT:
+        markdown = "\n\n".join(make(DEPTH) for _ in range(repeat))
+        elements = MarkdownParser.parse_string(markdown)
+        HtmlRenderer().render_markdown_elements(elements) # parses all the inline text first
+
+        indented_time, indented = time_func(lambda: HtmlRenderer().render_markdown_elements(elements))
+        compact_time, compact = time_func(lambda: HtmlRenderer(compact=True).render_markdown_elements(elements))
+        assert [ line.strip() for line in indented.split("\n") ] == [ line.strip() for line in compact.split("\n") ]
+        assert "\n".join(HtmlRenderer(compact=True).render_element(el) for el in elements) == compact
+        print(f"{name:<9} {DEPTH} levels x {repeat:>5}  indented {indented_time:.4f}s {len(indented) / 1024:>8.0f} KB"
+              f"  compact {compact_time:.4f}s {len(compact) / 1024:>8.0f} KB")
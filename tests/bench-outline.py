@@ -0,0 +1,26 @@
+import os
+import sys
+import time
+from tempfile import NamedTemporaryFile
+
+from amtools.markdown.parsers import MarkdownParser
+from benchmarks import CorpusGenerator
+
+SIZES_KB = [ 100, 1000, 10000 ]
+if len(sys.argv) > 1:
+    SIZES_KB = [ int(arg) for arg in sys.argv[1:] ]
+
+def time_func(func) -> (float, object):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+for size in SIZES_KB:
+    with NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+        f.write(CorpusGenerator(0).document(size * 1024))
+    try:
+        full, elements = time_func(lambda: MarkdownParser.parse_file(f.name))
+        scan, outline = time_func(lambda: MarkdownParser.scan_outline_file(f.name))
+        print(f"{size:>6} KB  parse_file {full:.4f}s  scan_outline_file {scan:.4f}s  ({full / scan:.1f}x faster, {len(outline)} headings)")
+    finally:
+        os.remove(f.name)
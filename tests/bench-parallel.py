@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+from amtools.markdown.parsers import MarkdownParser
+
+# Usage: python bench-parallel.py [file.md] [max workers]
+filename = "md2pdf/P2_Trees.md"
+if len(sys.argv) > 1:
+    filename = sys.argv[1]
+max_workers = os.cpu_count() or 1
+if len(sys.argv) > 2:
+    max_workers = int(sys.argv[2])
+
+with open(filename, 'r') as f:
+    markdown = f.read()
+
+# Repeat small documents to get something worth splitting up
+while len(markdown) < 10 * 1024 * 1024:
+    markdown += "\n\n" + markdown
+
+start = time.perf_counter()
+expected = list(map(str, MarkdownParser.parse_string(markdown)))
+sequential = time.perf_counter() - start
+print(f"{len(markdown) // 1024} KB, sequential: {sequential:.3f}s")
+
+for workers in range(1, max_workers + 1):
+    start = time.perf_counter()
+    elements = MarkdownParser.parse_string_parallel(markdown, workers=workers)
+    elapsed = time.perf_counter() - start
+    same = list(map(str, elements)) == expected
+    print(f"{workers:>3} workers: {elapsed:.3f}s  speedup {sequential / elapsed:.2f}x  {'same' if same else 'DIFFERENT'}")
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+from tempfile import NamedTemporaryFile
+
+from amtools import FileReader, MMapReader
+
+SIZES_MB = [ 10, 100 ]
+if len(sys.argv) > 1:
+    SIZES_MB = [ int(arg) for arg in sys.argv[1:] ]
+
+LINES = [
+    "# A heading for the section",
+    "Some paragraph text with **bold** and _italics_ in it, long enough to be realistic.",
+    "* a list item with a [link](https://www.google.com)",
+    "",
+    "| col 1 | col 2 | col 3 |",
+]
+
+def make_file(size_mb: int) -> str:
+    """ Writes a temporary markdown file of roughly the given size """
+    block = ("\n".join(LINES) + "\n") * 1000
+    with NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+        for _ in range((size_mb * 1024 * 1024) // len(block) + 1):
+            f.write(block)
+    return f.name
+
+def time_reader(reader_type: type, filename: str) -> (float, int):
+    """ Reads every line of the file, peeking before each read """
+    start = time.perf_counter()
+    reader = reader_type(filename)
+    num_lines = 0
+    while not reader.at_end():
+        reader.peek()
+        reader.read_line()
+        num_lines += 1
+    return time.perf_counter() - start, num_lines
+
+for size in SIZES_MB:
+    filename = make_file(size)
+    try:
+        for reader_type in [ FileReader, MMapReader ]:
+            elapsed, num_lines = time_reader(reader_type, filename)
+            print(f"{size:>4} MB  {reader_type.__name__:<12} {num_lines:>10} lines  {elapsed:.3f}s")
+    finally:
+        os.remove(filename)
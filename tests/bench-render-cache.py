@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer, RenderCache
+from benchmarks import CorpusGenerator
+
+NUM_DOCS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+DOC_KB = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+CHANGED = 0.05 # fraction of the documents edited between the builds
+
+def build(documents: list, cache: RenderCache = None) -> (float, list):
+    """ Parses and renders every document, returns the time and the html """
+    start = time.perf_counter()
+    renderer = HtmlRenderer()
+    if cache is not None:
+        renderer.enable_render_cache(cache)
+    html = [ renderer.render_markdown_elements(MarkdownParser.parse_string(doc)) for doc in documents ]
+    return time.perf_counter() - start, html
+
+documents = [ CorpusGenerator(seed).document(DOC_KB * 1024) for seed in range(NUM_DOCS) ]
+edited = list(documents)
+for i in range(0, NUM_DOCS, int(1 / CHANGED)):
+    edited[i] = CorpusGenerator(NUM_DOCS + i).document(DOC_KB * 1024)
+
+print(f"{NUM_DOCS} documents of {DOC_KB} KB, {int(CHANGED * 100)}% edited between builds")
+with TemporaryDirectory() as temp_dir:
+    cache_file = os.path.join(temp_dir, "render-cache.json")
+
+    elapsed, expected = build(documents)
+    print(f"  no cache          {elapsed:.3f}s")
+
+    cache = RenderCache(filename=cache_file)
+    elapsed, html = build(documents, cache)
+    cache.save()
+    assert html == expected
+    print(f"  empty cache       {elapsed:.3f}s  {cache.misses} misses  saved {os.path.getsize(cache_file) / 1024 / 1024:.1f} MB")
+
+    start = time.perf_counter()
+    cache = RenderCache(filename=cache_file)
+    load_time = time.perf_counter() - start
+    elapsed, html = build(documents, cache)
+    assert html == expected
+    print(f"  unchanged         {elapsed:.3f}s  {cache.hits} hits  {cache.misses} misses  (+{load_time:.3f}s loading the cache)")
+
+    cache = RenderCache(filename=cache_file)
+    elapsed, html = build(edited, cache)
+    assert html == build(edited)[1]
+    print(f"  {int(CHANGED * 100)}% edited         {elapsed:.3f}s  {cache.hits} hits  {cache.misses} misses")
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import tracemalloc
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer
+from benchmarks import CorpusGenerator
+
+CSS_FILES = [ os.path.join(os.path.dirname(__file__), "..", "res", "pdf-theme.css") ]
+SIZES_KB = [ 100, 1000, 10000 ]
+if len(sys.argv) > 1:
+    SIZES_KB = [ int(arg) for arg in sys.argv[1:] ]
+
+def write_document(renderer, elements) -> None:
+    with open(os.devnull, 'w') as f:
+        f.write(renderer.render_document("bench", elements, css_files=CSS_FILES))
+
+def stream_document(renderer, elements) -> None:
+    with open(os.devnull, 'w') as f:
+        renderer.render_document_to(f, "bench", elements, css_files=CSS_FILES)
+
+def measure(func) -> (float, int):
+    """ Returns the time and the peak memory allocated while running func """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+renderer = HtmlRenderer()
+for size in SIZES_KB:
+    elements = MarkdownParser.parse_string(CorpusGenerator(0).document(size * 1024))
+    write_document(renderer, elements) # parses all the inline text first
+
+    for name, func in [ ("render_document", write_document), ("render_document_to", stream_document) ]:
+        elapsed, peak = measure(lambda: func(renderer, elements))
+        print(f"{size:>6} KB  {name:<20} {elapsed:.3f}s  peak {peak / 1024 / 1024:8.2f} MB")
@@ -0,0 +1,33 @@
+import sys
+import time
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.renderers import HtmlRenderer
+
+ROWS = [ 1000, 10000, 100000 ]
+if len(sys.argv) > 1:
+    ROWS = [ int(arg) for arg in sys.argv[1:] ]
+
+COLS = 6
+CELLS = [ "plain", "**bold** cell", "`code`", "[link](https://www.google.com)", "_it_ and ~~st~~", "$x^2$ math" ]
+
+def make_table(num_rows: int) -> str:
+    lines = [ "| " + " | ".join(f"heading {i}" for i in range(COLS)) + " |" ]
+    lines.append("|" + "---|" * COLS)
+    for r in range(num_rows):
+        lines.append("| " + " | ".join(CELLS[(r + c) % len(CELLS)] for c in range(COLS)) + " |")
+    return "\n".join(lines)
+
+def time_func(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+renderer = HtmlRenderer()
+for num_rows in ROWS:
+    markdown = make_table(num_rows)
+    parse = time_func(lambda: MarkdownParser.parse_string(markdown))
+    elements = MarkdownParser.parse_string(markdown)
+    widths = time_func(lambda: elements[0].widths)
+    render = time_func(lambda: renderer.render_markdown_elements(elements))
+    print(f"{num_rows:>8} rows  parse {parse:.4f}s  widths {widths:.4f}s  render {render:.4f}s")
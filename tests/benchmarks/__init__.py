@@ -0,0 +1 @@
+from .corpus import CorpusGenerator
@@ -0,0 +1,115 @@
+import random
+
+WORDS = [
+    "tree", "node", "binary", "search", "insert", "remove", "value", "root", "leaf", "height",
+    "the", "a", "of", "to", "and", "is", "in", "that", "for", "with", "each", "every", "left", 
+    "right", "child", "parent", "recursive", "method", "return", "null", "data", "class", "list",
+]
+
+LANGUAGES = [ "", "java", "python", "cpp" ]
+CALLOUT_TYPES = [ "note", "tip", "warning", "example", "question" ]
+
+class CorpusGenerator:
+    """ Generates realistic markdown documents from a fixed seed, 
+            so every run benchmarks the same text """
+
+    def __init__(self, seed: int = 0):
+        self.rand = random.Random(seed)
+
+    def words(self, low: int, high: int) -> str:
+        return " ".join(self.rand.choice(WORDS) for _ in range(self.rand.randint(low, high)))
+
+    def inline_text(self, low: int = 6, high: int = 20) -> str:
+        """ A run of words with some inline formatting mixed in """
+        parts = []
+        for _ in range(self.rand.randint(low, high)):
+            roll = self.rand.random()
+            word = self.rand.choice(WORDS)
+            if roll < 0.05:
+                parts.append(f"**{self.words(1, 3)}**")
+            elif roll < 0.08:
+                parts.append(f"_{self.words(1, 3)}_")
+            elif roll < 0.11:
+                parts.append(f"`{word}()`")
+            elif roll < 0.13:
+                parts.append(f"$O({word[0]} \\log n)$")
+            elif roll < 0.15:
+                parts.append(f"[{self.words(1, 3)}]({word}.md)")
+            elif roll < 0.16:
+                parts.append(f"<https://www.{word}.com>")
+            elif roll < 0.17:
+                parts.append(f"=={word}==")
+            else:
+                parts.append(word)
+        return " ".join(parts)
+
+    def heading(self) -> list:
+        return [ "#" * self.rand.randint(1, 4) + " " + self.words(2, 6).capitalize(), "" ]
+
+    def paragraph(self) -> list:
+        lines = [ self.inline_text() for _ in range(self.rand.randint(1, 5)) ]
+        return lines + [ "" ]
+
+    def nested_list(self) -> list:
+        lines = []
+        depth = 0
+        for i in range(self.rand.randint(2, 15)):
+            depth = max(0, min(depth + self.rand.randint(-1, 1), 4))
+            marker = "-" if depth % 2 == 0 else f"{i+1}."
+            lines.append("\t" * depth + marker + " " + self.inline_text(3, 10))
+        return lines + [ "" ]
+
+    def task_list(self) -> list:
+        lines = [ f"- [{self.rand.choice(' x?')}] " + self.inline_text(3, 8) for _ in range(self.rand.randint(2, 6)) ]
+        return lines + [ "" ]
+
+    def table(self) -> list:
+        cols = self.rand.randint(2, 6)
+        lines = [ "| " + " | ".join(self.words(1, 2) for _ in range(cols)) + " |" ]
+        lines.append("|" + "---|" * cols)
+        for _ in range(self.rand.randint(2, 20)):
+            lines.append("| " + " | ".join(self.inline_text(1, 4) for _ in range(cols)) + " |")
+        return lines + [ "" ]
+
+    def code_block(self) -> list:
+        lines = [ "```" + self.rand.choice(LANGUAGES) ]
+        for _ in range(self.rand.randint(3, 15)):
+            lines.append("    " * self.rand.randint(0, 3) + self.words(2, 8) + ";")
+        return lines + [ "```", "" ]
+
+    def callout(self) -> list:
+        lines = [ f"> [!{self.rand.choice(CALLOUT_TYPES)}] " + self.words(0, 3).capitalize() ]
+        for _ in range(self.rand.randint(1, 4)):
+            lines.append("> " + self.inline_text(4, 12))
+        if self.rand.random() < 0.3:
+            lines.append("> - " + self.inline_text(2, 6))
+            lines.append("> - " + self.inline_text(2, 6))
+        return lines + [ "" ]
+
+    def misc(self) -> list:
+        word = self.rand.choice(WORDS)
+        return [ self.rand.choice([ "---", f"![{word}|300]({word}.png)", "<!-- pb -->", "// a comment" ]), "" ]
+
+    def block(self) -> list:
+        """ A random top-level block, weighted roughly like our notes """
+        roll = self.rand.random()
+        if roll < 0.12: return self.heading()
+        if roll < 0.50: return self.paragraph()
+        if roll < 0.65: return self.nested_list()
+        if roll < 0.70: return self.task_list()
+        if roll < 0.78: return self.table()
+        if roll < 0.86: return self.code_block()
+        if roll < 0.94: return self.callout()
+        return self.misc()
+
+    def document(self, size: int, metadata: bool = True) -> str:
+        """ Returns a markdown document of about size characters """
+        lines = []
+        length = 0
+        if metadata:
+            lines += [ "---", f"title: '{self.words(2, 4)}'", "---" ]
+        while length < size:
+            block = self.block()
+            lines.extend(block)
+            length += sum(len(line) + 1 for line in block)
+        return "\n".join(lines)
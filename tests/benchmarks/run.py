@@ -0,0 +1,127 @@
+""" Times the markdown parser and html renderer on a generated corpus
+
+    Usage (from the tests directory):
+        python -m benchmarks.run [--sizes 10K,100K,1M,10M,100M] [--repeat 3]
+                                 [--output results.json] [--baseline old.json] [--profile]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from tempfile import NamedTemporaryFile
+
+from amtools.markdown.parsers import MarkdownParser, ParseProfiler
+from amtools.markdown.elements import walk
+from amtools.markdown.renderers import HtmlRenderer
+
+from .corpus import CorpusGenerator
+
+CSS_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "res", "pdf-theme.css")
+UNITS = { 'K': 1024, 'M': 1024 * 1024 }
+
+# A benchmark this much slower than the baseline counts as a regression
+REGRESSION_RATIO = 1.10
+
+def parse_size(size: str) -> int:
+    if size[-1].upper() in UNITS:
+        return int(float(size[:-1]) * UNITS[size[-1].upper()])
+    return int(size)
+
+def best_time(func, repeat: int) -> float:
+    """ Runs func repeat times and returns the fastest run in seconds """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def parse_all_inline(markdown: str) -> None:
+    """ Parses the document and then every piece of inline text (which is otherwise parsed on first use) """
+    for element in walk(MarkdownParser.parse_string(markdown)):
+        pass
+
+def run_size(markdown: str, repeat: int) -> dict:
+    """ Times each stage separately on the given document """
+    results = {}
+    with NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
+        f.write(markdown)
+    try:
+        results['parse_string'] = best_time(lambda: MarkdownParser.parse_string(markdown), repeat)
+        results['parse_string_inline'] = best_time(lambda: parse_all_inline(markdown), repeat)
+        results['parse_file'] = best_time(lambda: MarkdownParser.parse_file(f.name), repeat)
+    finally:
+        os.remove(f.name)
+
+    elements = MarkdownParser.parse_string(markdown)
+    renderer = HtmlRenderer()
+    results['render_markdown_elements'] = best_time(lambda: renderer.render_markdown_elements(elements), repeat)
+    results['render_document'] = best_time(lambda: renderer.render_document("bench", elements, css_files=[ CSS_FILE ]), repeat)
+    return results
+
+def profile(markdown: str, top: int = 15) -> dict:
+    """ Parses the document (and all its inline text) once with profiling on and prints the slowest matchers/methods """
+    profiler = ParseProfiler()
+    for element in walk(MarkdownParser.parse_string(markdown, profiler=profiler)):
+        pass
+    report = profiler.report()
+    for name, stats in list(report.items())[:top]:
+        print(f"  {name[:40]:<40} {stats['attempts']:>9} attempts {stats['hits']:>9} hits  {stats['seconds']:.4f}s")
+    return report
+
+def compare(results: dict, baseline: dict) -> bool:
+    """ Prints each result against the baseline, returns False if anything regressed """
+    ok = True
+    for size, timings in results['results'].items():
+        for name, seconds in timings.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if old is None:
+                continue
+            ratio = seconds / old
+            flag = ""
+            if ratio > REGRESSION_RATIO:
+                flag = "  REGRESSION"
+                ok = False
+            print(f"{size:>6} {name:<26} {old:.4f}s -> {seconds:.4f}s  ({ratio:.2f}x){flag}")
+    return ok
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmarks the markdown parser and renderer")
+    arg_parser.add_argument("--sizes", default="10K,100K,1M,10M", help="comma separated document sizes (e.g. 10K,1M,100M)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (the fastest is kept)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed for the corpus generator")
+    arg_parser.add_argument("--output", help="file to save the results to as json")
+    arg_parser.add_argument("--baseline", help="json results from an earlier run to compare against")
+    arg_parser.add_argument("--profile", action="store_true", help="also profile the parser's matchers on the largest size")
+    args = arg_parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': { }
+    }
+    for size in args.sizes.split(","):
+        markdown = CorpusGenerator(args.seed).document(parse_size(size))
+        timings = run_size(markdown, args.repeat)
+        results['results'][size] = timings
+        print(f"{size:>6} " + "  ".join(f"{name}: {seconds:.4f}s" for name, seconds in timings.items()))
+
+    if args.profile:
+        results['profile'] = profile(markdown)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+""" Feeds pathological markdown to the parser at growing sizes and checks
+        that the parse time grows (close to) linearly with the input size
+
+    Usage (from the tests directory):
+        python -m benchmarks.stress [--size 2000] [--scale 8]
+"""
+import sys
+import time
+import argparse
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import walk
+
+# Time may grow this much faster than the input before a shape counts as non-linear
+SLACK = 2.5
+
+def repeat_to(unit: str, n: int) -> str:
+    return (unit * (n // len(unit) + 1))[:n]
+
+# Each shape builds a document of about n characters
+SHAPES = {
+    "unmatched **":         lambda n: repeat_to("** a ", n),
+    "unmatched `":          lambda n: repeat_to("` a ", n),
+    "unmatched $":          lambda n: repeat_to("$ a ", n),
+    "unmatched ***":        lambda n: "***" + repeat_to("a", n),
+    "unmatched [":          lambda n: repeat_to("[a](b ", n),
+    "unclosed <a.b":        lambda n: "<" + repeat_to("a.", n),
+    "long single line":     lambda n: repeat_to("word **bold** _it_ `code` [l](u) ", n),
+    "long paragraph":       lambda n: repeat_to("a\n", n),
+    "unclosed custom block": lambda n: "> [!!" + repeat_to("a", n),
+    "long table row":       lambda n: "|" + repeat_to("a|", n) + " x",
+    "nested quotes":        lambda n: repeat_to("> ", n) + "x",
+    "nested quote lines":   lambda n: "\n".join("> " * i + "x" for i in range(int((2*n) ** 0.5))),
+    "deep outline":         lambda n: "\n".join("\t" * i + "- x" for i in range(int((2*n) ** 0.5))),
+    "deep outline content": lambda n: "\n".join("\t" * i + "- x\n" + "\t" * (i+1) + "> y" for i in range(int(n ** 0.5))),
+    "nested callouts":      lambda n: "\n".join("> " * i + "> [!note]" for i in range(int((2*n) ** 0.5))),
+    "unclosed code block":  lambda n: "```\n" + repeat_to("code\n", n),
+}
+
+def parse_all(markdown: str) -> None:
+    """ Parses the document and all its inline text (which is otherwise parsed on first use) """
+    for element in walk(MarkdownParser.parse_string(markdown)):
+        pass
+
+def time_parse(markdown: str, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_all(markdown)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Checks the parser scales linearly on pathological input")
+    arg_parser.add_argument("--size", type=int, default=2000, help="the smaller input size (characters)")
+    arg_parser.add_argument("--scale", type=int, default=8, help="how many times bigger the larger input is")
+    args = arg_parser.parse_args()
+
+    failed = []
+    for name, make in SHAPES.items():
+        try:
+            small = time_parse(make(args.size))
+            large = time_parse(make(args.size * args.scale))
+        except RecursionError:
+            print(f"{name:<24} RecursionError")
+            failed.append(name)
+            continue
+
+        growth = large / max(small, 1e-6)
+        ok = growth <= args.scale * SLACK
+        print(f"{name:<24} {small:.4f}s -> {large:.4f}s  ({growth:.1f}x for {args.scale}x input){'' if ok else '  NOT LINEAR'}")
+        if not ok:
+            failed.append(name)
+
+    if failed:
+        print("Failed: " + ", ".join(failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
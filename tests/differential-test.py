@@ -0,0 +1,133 @@
+import os
+import re
+import sys
+import random
+import shutil
+from tempfile import TemporaryDirectory
+
+from amtools import ListReader, StringReader, StreamReader, PrefixReader
+from amtools.markdown.parsers import MarkdownParser, ParseCache
+from amtools.markdown.elements import Heading
+from benchmarks import CorpusGenerator
+
+NUM_DOCS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+# Lines that start, end or change blocks when inserted anywhere
+SNIPPETS = [ "", "text", "# heading", "---", "```", "```python", "> quote", "> [!note] title", "- item", "* item",
+             "    - nested", "\t1. nested", "1. item", "- [ ] task", "| a | b |", "|---|---|", "<!-- c -->" ]
+
+def strs(elements) -> list:
+    return [ str(el) for el in elements ]
+
+def read_all(reader) -> list:
+    lines = []
+    while not reader.at_end():
+        lines.append(reader.read_line())
+    return lines
+
+def edit(lines: list, rand: random.Random) -> None:
+    """ Inserts, deletes or changes a random line """
+    i = rand.randrange(len(lines) + 1)
+    op = rand.random()
+    if op < 0.4 or i == len(lines):
+        lines.insert(i, rand.choice(SNIPPETS))
+    elif op < 0.7:
+        del lines[i]
+    else:
+        lines[i] = rand.choice(SNIPPETS) + lines[i][:rand.randrange(10)]
+
+rand = random.Random(0)
+documents = [ CorpusGenerator(seed).document(rand.randrange(500, 5000), metadata=False) for seed in range(NUM_DOCS) ]
+
+# Incremental parsing after random edits matches a full parse
+reused = 0
+for markdown in documents:
+    lines = markdown.split("\n")
+    document = MarkdownParser.parse_incremental(markdown)
+    for _ in range(8):
+        for _ in range(rand.randrange(1, 4)):
+            edit(lines, rand)
+        markdown = "\n".join(lines)
+        previous_ids = set(map(id, document.elements))
+        document = MarkdownParser.parse_incremental(markdown, document)
+        reused += sum(id(el) in previous_ids for el in document.elements)
+        assert strs(document.elements) == strs(MarkdownParser.parse_string(markdown)), "parse_incremental differs"
+        outline = [ str(heading.title) for heading in MarkdownParser.scan_outline_string(markdown) ]
+        assert outline == [ str(el.title) for el in document.elements if isinstance(el, Heading) ], "scan_outline differs"
+assert reused > 0, "parse_incremental didn't reuse any elements"
+print(f"parse_incremental / scan_outline OK ({NUM_DOCS} documents x 8 edits, {reused} elements reused)")
+
+# parse_iter, parse_stream and parse_file match parse_markdown
+with TemporaryDirectory() as temp_dir:
+    filename = os.path.join(temp_dir, "doc.md")
+    for markdown in documents:
+        expected = strs(MarkdownParser().parse_markdown(ListReader(markdown.split("\n"))))
+        assert strs(MarkdownParser().parse_iter(ListReader(markdown.split("\n")))) == expected, "parse_iter differs"
+        assert strs(MarkdownParser.parse_string(markdown)) == expected, "parse_string differs"
+
+        chunks = [ markdown[i:i + 97] for i in range(0, len(markdown), 97) ]
+        assert strs(MarkdownParser.parse_stream(chunks)) == expected, "parse_stream differs"
+
+        # (starts with a heading, a file starting with --- is read as front matter)
+        with open(filename, 'w') as f:
+            f.write("# Title\n" + markdown)
+        assert strs(MarkdownParser.parse_file(filename)) == strs(MarkdownParser.parse_string("# Title\n" + markdown)), "parse_file differs"
+print("parse_iter / parse_stream / parse_file OK")
+
+# parse_string_parallel, split into as many chunks as it can, matches parse_string
+# (parse_table always skips the line after a table header, even a ``` line)
+for markdown in documents + [ "| a | b |\n```\n| x | y |\n```py\ncode\n\n# not heading\n```", "| a | b |\n\n| x | y |\n" ]:
+    assert strs(MarkdownParser.parse_string_parallel(markdown, workers=1, chunk_size=1)) == strs(MarkdownParser.parse_string(markdown)), "parse_string_parallel differs"
+print("parse_string_parallel OK")
+
+# The readers give the same lines as ListReader
+for markdown in documents:
+    lines = markdown.split("\n")
+    assert read_all(StringReader(markdown)) == read_all(ListReader(lines)), "StringReader differs"
+    # Like FileReader, a newline at the very end doesn't start another line
+    file_lines = lines[:-1] if markdown.endswith("\n") else lines
+    assert read_all(StreamReader([ markdown[i:i + 13] for i in range(0, len(markdown), 13) ])) == file_lines, "StreamReader differs"
+
+    # A quoted block, read through one PrefixReader per level of quoting
+    block = lines[:rand.randrange(1, len(lines) + 1)]
+    depth = rand.randrange(1, 5)
+    parent = ListReader([ "> " * depth + line for line in block ] + [ "after the quote" ])
+    reader = parent
+    for _ in range(depth):
+        reader = PrefixReader(reader, re.compile("> "))
+    assert read_all(reader) == block, "PrefixReader differs"
+    assert reader.line_number == len(block)
+    assert parent.peek() == "after the quote" and parent.line_number == len(block)
+print("StringReader / StreamReader / PrefixReader OK")
+
+# ParseCache keeps the most recently used entries under its size limit
+with TemporaryDirectory() as temp_dir:
+    cache = ParseCache(temp_dir, max_bytes=64 * 1024)
+    keys = []
+    for i, markdown in enumerate(documents[:40]):
+        key = f"doc{i}"
+        cache.store(key, MarkdownParser.parse_string(markdown))
+        keys.append(key)
+        assert cache.get_total_bytes() <= cache.max_bytes, "ParseCache is over its size limit"
+        os.utime(cache.entry_path(key), (i, i)) # distinct use times, older entries first
+    assert cache.get_total_bytes() == sum(size for path, mtime, size in cache.list_entries())
+
+    # Storing an entry again doesn't count it twice
+    total = cache.get_total_bytes()
+    cache.store(keys[-1], MarkdownParser.parse_string(documents[len(keys) - 1]))
+    assert cache.get_total_bytes() == total
+
+    kept = [ key for key in keys if os.path.exists(cache.entry_path(key)) ]
+    assert 0 < len(kept) < len(keys) and kept == keys[-len(kept):], "ParseCache evicted a recently used entry"
+    assert strs(cache.load(kept[-1])) == strs(MarkdownParser.parse_string(documents[len(keys) - 1]))
+    assert cache.load(keys[0]) is None
+
+    # A cache directory that goes away is a miss, not an error
+    filename = os.path.join(temp_dir, "doc.md")
+    with open(filename, 'w') as f:
+        f.write(documents[0])
+    cache = ParseCache(os.path.join(temp_dir, "removed"))
+    shutil.rmtree(cache.cache_dir)
+    assert strs(MarkdownParser.parse_file(filename, cache=cache)) == strs(MarkdownParser.parse_file(filename))
+    assert strs(MarkdownParser.parse_file(filename, cache=cache)) == strs(MarkdownParser.parse_file(filename))
+print(f"ParseCache OK ({len(kept)} of {len(keys)} entries kept)")
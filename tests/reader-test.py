@@ -0,0 +1,70 @@
+import io
+import os
+import gzip
+import time
+from tempfile import TemporaryDirectory
+
+from amtools import FileReader, MMapReader, StreamReader
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import Table
+
+TEXT = "# Heading\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\nlast line"
+NEWLINES = { "LF": "\n", "CRLF": "\r\n", "CR": "\r" }
+
+def read_all(reader) -> list:
+    lines = []
+    while not reader.at_end():
+        lines.append(reader.read_line())
+    return lines
+
+with TemporaryDirectory() as temp_dir:
+    for name, newline in NEWLINES.items():
+        for final_newline in [ True, False ]:
+            text = TEXT.replace("\n", newline) + (newline if final_newline else "")
+            filename = os.path.join(temp_dir, f"{name}-{final_newline}.md")
+            with open(filename, 'w', newline='') as f:
+                f.write(text)
+
+            expected = TEXT.split("\n")
+            for chunk_size in [ 1, 7, MMapReader.CHUNK_SIZE ]:
+                MMapReader.CHUNK_SIZE, default_size = chunk_size, MMapReader.CHUNK_SIZE
+                try:
+                    assert read_all(MMapReader(filename)) == expected, f"MMapReader {name} {final_newline} {chunk_size}"
+                finally:
+                    MMapReader.CHUNK_SIZE = default_size
+            assert read_all(FileReader(filename)) == expected, f"FileReader {name} {final_newline}"
+            for chunk_size in [ 1, 2, 7 ]:
+                # Small chunks split \r\n (and utf-8 characters) between chunks
+                StreamReader.CHUNK_SIZE, default_size = chunk_size, StreamReader.CHUNK_SIZE
+                try:
+                    with open(filename, 'rb') as f:
+                        assert read_all(StreamReader(f)) == expected, f"StreamReader bytes {name} {final_newline} {chunk_size}"
+                    with open(filename, 'r', newline='') as f:
+                        assert read_all(StreamReader(f)) == expected, f"StreamReader text {name} {final_newline} {chunk_size}"
+                finally:
+                    StreamReader.CHUNK_SIZE = default_size
+
+            parsed = MarkdownParser.parse_file(filename)
+            assert isinstance(parsed[1], Table), f"Table not parsed from {name} {final_newline}"
+            mapped = MarkdownParser.parse_file(filename, reader_type=MMapReader)
+            assert list(map(str, parsed)) == list(map(str, mapped)), f"MMapReader parse differs {name} {final_newline}"
+        print(f"{name} OK")
+
+    # Compressed files can't be memory-mapped
+    filename = os.path.join(temp_dir, "compressed.md.gz")
+    with gzip.open(filename, 'wt') as f:
+        f.write(TEXT)
+    assert read_all(FileReader(filename)) == TEXT.split("\n")
+    try:
+        MMapReader(filename)
+        assert False, "MMapReader read a compressed file"
+    except ValueError:
+        pass
+    print("Compressed OK")
+
+# A long line without newlines is joined once, not copied again for every chunk
+for size_mb in [ 2, 8 ]:
+    line = "x" * (size_mb << 20)
+    start = time.perf_counter()
+    assert read_all(StreamReader(io.StringIO(line + "\nnext"))) == [ line, "next" ]
+    print(f"StreamReader {size_mb} MB line {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,68 @@
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import content_hash
+from amtools.markdown.renderers import HtmlRenderer, RenderCache
+from amtools.markdown.renderers.html_renderer import function_key
+
+class Site:
+    def __init__(self, base: str):
+        self.base = base
+
+    def url(self, path: str) -> str:
+        return self.base + "/" + path
+
+def prefix_mapper(prefix: str):
+    return lambda path: prefix + path
+
+def render(elements: list, url_mapper, cache: RenderCache = None, url_mapper_key: str = None) -> str:
+    renderer = HtmlRenderer(url_mapper)
+    if cache is not None:
+        renderer.enable_render_cache(cache, url_mapper_key)
+    return renderer.render_markdown_elements(elements)
+
+elements = MarkdownParser.parse_string("A [link](notes.md) and ![image](fig.png)\n\n- [item](other.md)\n")
+
+# Mappers that differ only in their state need a url_mapper_key
+site_a, site_b = Site("/course-a"), Site("/course-b")
+for mapper in [ site_a.url, Site, prefix_mapper([ "/course-a/" ]) ]:
+    try:
+        HtmlRenderer(mapper).enable_render_cache(RenderCache())
+        assert False, f"no ValueError for {mapper!r}"
+    except ValueError:
+        pass
+cache = RenderCache()
+assert render(elements, site_a.url, cache, "course-a") == render(elements, site_a.url)
+assert render(elements, site_b.url, cache, "course-b") == render(elements, site_b.url)
+assert "/course-b/notes.md" in render(elements, site_b.url, cache, "course-b")
+assert cache.hits > 0
+print("stateful url mappers OK")
+
+# Plain functions get a key from their code and the simple values they close over
+mapper_a, mapper_b = prefix_mapper("/a/"), prefix_mapper("/b/")
+assert function_key(mapper_a) != function_key(mapper_b)
+assert function_key(mapper_a) == function_key(prefix_mapper("/a/"))
+assert function_key(lambda path: "/a/" + path) != function_key(lambda path: "/b/" + path)
+assert "0x" not in function_key(mapper_a) # no memory addresses, so the key is the same in the next run
+cache = RenderCache()
+for mapper in [ mapper_a, mapper_b, mapper_a, None ]:
+    assert render(elements, mapper, cache) == render(elements, mapper)
+assert cache.hits > 0
+print("function url mappers OK")
+
+# Nested lists and quotes hash the same with and without a memo, and a change at the bottom changes the top
+def nested(depth: int, last: str) -> str:
+    items = "\n".join("    " * d + f"- item {d}" for d in range(depth)) + "\n" + "    " * depth + "- " + last
+    return items + "\n\n" + "\n".join("> " * d + f"quote {d}" for d in range(1, depth + 1))
+
+elements = MarkdownParser.parse_string(nested(12, "last"))
+memo = { }
+assert [ content_hash(el, memo) for el in elements ] == [ content_hash(el) for el in elements ]
+assert len(memo) > len(elements)
+changed = MarkdownParser.parse_string(nested(12, "changed"))
+assert content_hash(elements[0]) != content_hash(changed[0]) and content_hash(elements[1]) == content_hash(changed[1])
+
+cache = RenderCache()
+for markdown in [ nested(12, "last"), nested(12, "changed"), nested(12, "last") ]:
+    elements = MarkdownParser.parse_string(markdown)
+    assert render(elements, None, cache) == render(elements, None)
+assert cache.hits > 0
+print("nested elements OK")
@@ -0,0 +1,129 @@
+import sys
+import time
+import pickle
+
+from amtools.markdown.parsers import MarkdownParser
+from amtools.markdown.elements import *
+from amtools.markdown.elements.serialization import ELEMENT_CLASSES, class_slots
+from benchmarks import CorpusGenerator
+
+MARKDOWN = """
+# Heading with **bold**, _italics_, ***both***, ~~strike~~, ==highlight==, `code` and $x^2$
+
+A paragraph with a [link](https://www.google.com "title") and <https://a.b/c>\\
+on two lines
+<!-- a comment -->
+<!-- pb -->
+
+---
+![alt|100](image.png "title")
+[![alt](image.png)](https://www.google.com)
+![[embedded.png]]
+
+```python
+code block
+```
+
+> a block quote
+> > nested
+
+> [!warning] Callout title
+> callout text
+
+> [!!card|Card title]
+> card text
+
+> [!!link_list]
+> [a link](https://www.google.com)
+
+- [ ] task
+- [x] done
+- [?] unknown
+
+- bullet
+    1. numbered
+
+| a | **b** |
+|---|---|
+| 1 | 2 |
+| 3 |
+"""
+
+def same_tree(a, b) -> bool:
+    """ Compares two values element by element, slot by slot """
+    if type(a) != type(b):
+        return False
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same_tree(x, y) for x, y in zip(a, b))
+    if type(a) in ELEMENT_CLASSES:
+        for slot in class_slots(type(a)):
+            if hasattr(a, slot) != hasattr(b, slot):
+                return False
+            if hasattr(a, slot) and not same_tree(getattr(a, slot), getattr(b, slot)):
+                return False
+        return True
+    return a == b
+
+def collect_types(value, types: set) -> None:
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            collect_types(item, types)
+    elif type(value) in ELEMENT_CLASSES:
+        types.add(type(value))
+        for slot in class_slots(type(value)):
+            if hasattr(value, slot):
+                collect_types(getattr(value, slot), types)
+
+# Round trip every element type
+parsed = MarkdownParser.parse_string(MARKDOWN)
+elements = parsed + [ EmptyElement(), Tag("tag"), InlineText(RawText("a"), LineBreak(), RawText("b")) ]
+types = set()
+collect_types(pickle.loads(pickle.dumps(elements)), types)
+
+missing = [ cls.__name__ for cls in ELEMENT_CLASSES if cls not in types ]
+assert len(missing) == 0, "Not covered: " + ", ".join(missing)
+
+loaded = load_elements(dump_elements(elements))
+assert same_tree(pickle.loads(pickle.dumps(elements)), loaded), "Round trip changed the elements"
+assert '\n'.join(map(str, parsed)) == '\n'.join(map(str, loaded[:len(parsed)]))
+assert [ content_hash(el) for el in elements ] == [ content_hash(el) for el in loaded ], "Round trip changed a content hash"
+print(f"Round trip OK for all {len(ELEMENT_CLASSES)} element types")
+
+# A table keeps its raw cells, which are parsed after loading like before dumping
+table = MarkdownParser.parse_string("| a | **b** |\n|---|---|\n| [1](x.md) | `2` |")[0]
+loaded = load_elements(dump_elements([ table ]))[0]
+assert loaded.parse_func is not None and str(loaded) == str(table)
+
+# Any other function in an element can't be saved (it would come back as None)
+heading = Heading("1", InlineText(RawText("title")), None)
+heading.hid = str.upper
+try:
+    dump_elements([ heading ])
+    assert False, "dumped a function"
+except TypeError:
+    pass
+print("Table cells / functions OK")
+
+# Size and speed against pickle
+def best_time(func, repeat: int = 3) -> (float, object):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+elements = MarkdownParser.parse_string(CorpusGenerator(0).document(size_kb * 1024))
+data = dump_elements(elements) # parses all the inline text first
+
+dump_time, data = best_time(lambda: dump_elements(elements))
+load_time, loaded = best_time(lambda: load_elements(data))
+pickle_dump_time, pickled = best_time(lambda: pickle.dumps(elements, protocol=pickle.HIGHEST_PROTOCOL))
+pickle_load_time, unpickled = best_time(lambda: pickle.loads(pickled))
+assert same_tree(unpickled, loaded)
+
+print(f"{size_kb} KB document")
+print(f"  binary  {len(data) / 1024:>9.1f} KB  dump {dump_time:.4f}s  load {load_time:.4f}s")
+print(f"  pickle  {len(pickled) / 1024:>9.1f} KB  dump {pickle_dump_time:.4f}s  load {pickle_load_time:.4f}s")